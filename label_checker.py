@@ -1,7 +1,324 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk, ImageDraw
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import os
+import queue
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modules'))
+import label_codec
+from dataset_index import DatasetIndex
+from importers import load_classes
+from label_query import LabelQueryIndex
+
+
+DISPLAY_SIZE = (800, 600)
+PREFETCH_RADIUS = 4  # 현재 이미지 앞뒤로 미리 준비할 이미지 수
+THUMB_SIZE = (160, 120)
+CELL_PADDING = 8
+
+
+def draw_labels(image, label_path):
+    """YOLO 라벨 박스를 이미지 위에 그림"""
+    _, boxes = label_codec.read(label_path)
+
+    # YOLO 좌표를 이미지 좌표 (좌상단, 우하단) 로 한 번에 변환
+    size = np.array(image.size, dtype=float)
+    centers = boxes[:, 0:2] * size
+    halves = boxes[:, 2:4] * size / 2
+    corners = np.hstack([centers - halves, centers + halves])
+
+    draw = ImageDraw.Draw(image)
+    for x1, y1, x2, y2 in corners.tolist():
+        # 바운딩 박스 그리기
+        draw.rectangle([x1, y1, x2, y2], outline="red", width=2)
+
+
+def render_preview(image_path, label_folder, size=DISPLAY_SIZE):
+    """축소 디코딩한 이미지에 라벨을 그려서 (이미지, 라벨 파일 존재 여부) 반환"""
+    image = Image.open(image_path)
+    # JPEG 는 표시 크기에 맞는 해상도로만 디코딩 (DCT 스케일링)
+    image.draft("RGB", size)
+    image.thumbnail(size)
+    image = image.convert("RGB")
+
+    label_path = label_codec.label_path_for(image_path, label_folder)
+    if not os.path.exists(label_path):
+        return image, False
+    draw_labels(image, label_path)
+    return image, True
+
+
+class ImagePrefetcher:
+    """백그라운드 스레드에서 앞뒤 이미지를 미리 디코딩/오버레이해서 제한된 크기로 캐시"""
+
+    def __init__(self, render, cache_size=PREFETCH_RADIUS * 2 + 4):
+        self.render = render
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.wanted = []
+        self.loading = None
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def clear(self):
+        with self.condition:
+            self.cache.clear()
+            self.wanted = []
+
+    def discard(self, key):
+        with self.condition:
+            self.cache.pop(key, None)
+
+    def get(self, key):
+        with self.condition:
+            # 작업 스레드가 처리 중이면 새로 디코딩하지 않고 기다림
+            while self.loading == key and key not in self.cache:
+                self.condition.wait()
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        result = self.render(key)
+        self._store(key, result)
+        return result
+
+    def prefetch(self, keys):
+        # 이전 요청은 버리고 현재 위치 기준의 목록으로 교체
+        with self.condition:
+            self.wanted = [key for key in keys if key not in self.cache]
+            self.condition.notify_all()
+
+    def _store(self, key, result):
+        with self.condition:
+            self.cache[key] = result
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.wanted:
+                    self.condition.wait()
+                key = self.wanted.pop(0)
+                if key in self.cache:
+                    continue
+                self.loading = key
+            try:
+                self._store(key, self.render(key))
+            except Exception as e:
+                print(f"Error in prefetch: {e}")
+            finally:
+                with self.condition:
+                    self.loading = None
+                    self.condition.notify_all()
+
+
+class ThumbnailCache:
+    """라벨을 그린 썸네일을 디스크에 저장 (이미지 경로별 파일 하나, 이미지/라벨 파일의 수정 시각과 크기로 갱신 확인)"""
+
+    def __init__(self, cache_folder, size=THUMB_SIZE, workers=None):
+        self.cache_folder = cache_folder
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4)
+
+    def close(self):
+        # 폴더를 바꾸면 이전 폴더의 대기 중인 썸네일 작업은 버림
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def key(self, image_path, label_path):
+        """(이미지 경로 해시, 파일 상태 해시)"""
+        path_key = hashlib.sha1(f"{os.path.abspath(image_path)}|{self.size}".encode("utf-8")).hexdigest()
+        parts = []
+        for path in (image_path, label_path):
+            try:
+                stat = os.stat(path)
+                parts += [str(stat.st_mtime_ns), str(stat.st_size)]
+            except OSError:
+                parts += ["-", "-"]
+        return path_key, hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    def cache_path(self, key):
+        # 파일이 많아도 디렉터리 하나가 너무 커지지 않도록 앞 두 글자로 나눔
+        path_key, stamp_key = key
+        return os.path.join(self.cache_folder, path_key[:2], f"{path_key}.{stamp_key}.jpg")
+
+    def prune(self, key):
+        # 이미지나 라벨이 수정되면 키가 바뀌므로 같은 이미지의 이전 썸네일은 삭제
+        path_key, stamp_key = key
+        folder = os.path.join(self.cache_folder, path_key[:2])
+        current = f"{path_key}.{stamp_key}.jpg"
+        with os.scandir(folder) as it:
+            stale = [e.path for e in it if e.name.startswith(path_key + ".") and e.name != current
+                     and e.name.endswith(".jpg")]
+        for path in stale:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # 다른 스레드가 먼저 삭제
+
+    def load(self, image_path, label_folder):
+        key = self.key(image_path, label_codec.label_path_for(image_path, label_folder))
+        path = self.cache_path(key)
+        if os.path.exists(path):
+            try:
+                image = Image.open(path)
+                image.load()
+                return image
+            except OSError:
+                pass  # 깨진 캐시 파일은 다시 생성
+
+        image, _ = render_preview(image_path, label_folder, self.size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        image.save(temp_path, "JPEG", quality=85)
+        os.replace(temp_path, path)
+        self.prune(key)
+        return image
+
+    def submit(self, image_path, label_folder):
+        return self.executor.submit(self.load, image_path, label_folder)
+
+
+class ThumbnailGrid(tk.Frame):
+    """보이는 칸만 만드는 가상화된 썸네일 격자"""
+
+    def __init__(self, parent, on_select, width=800, height=600):
+        super().__init__(parent)
+        self.on_select = on_select
+        self.canvas = tk.Canvas(self, width=width, height=height, background="gray20")
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", lambda event: self.layout())
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+        self.canvas.bind("<Button-1>", self.on_click)
+
+        self.cell_w = THUMB_SIZE[0] + CELL_PADDING
+        self.cell_h = THUMB_SIZE[1] + CELL_PADDING
+        self.columns = 1
+        self.image_paths = []
+        self.label_folder = ""
+        self.cache = None
+        self.cells = {}  # index -> (캔버스 아이템 id, PhotoImage 또는 None)
+        self.pending = {}  # index -> Future
+        self.results = queue.Queue()
+        self.after(30, self.poll_results)
+
+    def set_items(self, image_paths, label_folder, cache_folder):
+        self.image_paths = image_paths
+        self.label_folder = label_folder
+        if self.cache is None or self.cache.cache_folder != cache_folder:
+            if self.cache is not None:
+                self.cache.close()
+            self.cache = ThumbnailCache(cache_folder)
+        self.clear_cells()
+        self.canvas.yview_moveto(0)
+        self.layout()
+
+    def update_items(self, image_paths):
+        # 파일이 추가/삭제되어도 스크롤 위치는 유지
+        self.image_paths = image_paths
+        self.clear_cells()
+        self.layout()
+
+    def clear_cells(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        self.canvas.delete("all")
+        self.cells.clear()
+
+    def layout(self):
+        columns = max(1, self.canvas.winfo_width() // self.cell_w)
+        if columns != self.columns:
+            self.columns = columns
+            self.clear_cells()
+        rows = -(-len(self.image_paths) // self.columns)
+        self.canvas.configure(scrollregion=(0, 0, self.columns * self.cell_w, rows * self.cell_h),
+                              yscrollincrement=self.cell_h // 4)
+        self.refresh()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.refresh()
+
+    def on_mouse_wheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first = int(top // self.cell_h) * self.columns
+        last = (int(bottom // self.cell_h) + 1) * self.columns
+        return max(0, first), min(len(self.image_paths), last)
+
+    def refresh(self):
+        if self.cache is None:
+            return
+        first, last = self.visible_range()
+
+        # 화면 밖으로 나간 칸과 아직 시작하지 않은 요청은 정리
+        for index in [i for i in self.cells if not first <= i < last]:
+            self.canvas.delete(self.cells.pop(index)[0])
+        for index in [i for i in self.pending if not first <= i < last]:
+            self.pending.pop(index).cancel()
+
+        for index in range(first, last):
+            if index in self.cells:
+                continue
+            row, column = divmod(index, self.columns)
+            x = column * self.cell_w + CELL_PADDING // 2
+            y = row * self.cell_h + CELL_PADDING // 2
+            item = self.canvas.create_rectangle(x, y, x + THUMB_SIZE[0], y + THUMB_SIZE[1], outline="gray40")
+            self.cells[index] = (item, None)
+            if index not in self.pending:
+                future = self.cache.submit(self.image_paths[index], self.label_folder)
+                future.add_done_callback(lambda f, i=index, path=self.image_paths[index]:
+                                         self.results.put((i, path, f)))
+                self.pending[index] = future
+
+    def poll_results(self):
+        # Tk 는 메인 스레드에서만 다룰 수 있으므로 작업 결과를 주기적으로 가져와서 표시
+        try:
+            while True:
+                index, path, future = self.results.get_nowait()
+                if self.pending.get(index) is future:
+                    del self.pending[index]
+                if future.cancelled() or index not in self.cells or index >= len(self.image_paths) \
+                        or self.image_paths[index] != path:
+                    continue
+                if future.exception() is not None:
+                    print(f"Error in thumbnail: {future.exception()}")
+                    continue
+                image = future.result()
+                photo = ImageTk.PhotoImage(image)
+                row, column = divmod(index, self.columns)
+                x = column * self.cell_w + CELL_PADDING // 2 + (THUMB_SIZE[0] - image.width) // 2
+                y = row * self.cell_h + CELL_PADDING // 2 + (THUMB_SIZE[1] - image.height) // 2
+                self.canvas.delete(self.cells[index][0])
+                self.cells[index] = (self.canvas.create_image(x, y, anchor=tk.NW, image=photo), photo)
+        except queue.Empty:
+            pass
+        self.after(30, self.poll_results)
+
+    def on_click(self, event):
+        column = int(self.canvas.canvasx(event.x) // self.cell_w)
+        row = int(self.canvas.canvasy(event.y) // self.cell_h)
+        index = row * self.columns + column
+        if column < self.columns and 0 <= index < len(self.image_paths):
+            self.on_select(index)
 
 
 class YoloLabelViewer:
@@ -21,9 +338,53 @@ class YoloLabelViewer:
         self.next_button = tk.Button(root, text="다음 이미지", command=self.next_image, state=tk.DISABLED)
         self.next_button.pack()
 
+        # 이전 이미지로 이동 버튼
+        self.prev_button = tk.Button(root, text="이전 이미지", command=self.prev_image, state=tk.DISABLED)
+        self.prev_button.pack()
+
+        # 격자 보기 전환 버튼
+        self.grid_button = tk.Button(root, text="격자 보기", command=self.toggle_grid, state=tk.DISABLED)
+        self.grid_button.pack()
+        self.grid = ThumbnailGrid(root, self.select_from_grid)
+        self.grid_visible = False
+
+        # 검색창: "class = ink", "area < 0.1%", "boxes > 20", "no labels", "created after 2024-01-01" (and 로 연결)
+        query_frame = tk.Frame(root)
+        query_frame.pack()
+        self.query_entry = tk.Entry(query_frame, width=40)
+        self.query_entry.pack(side=tk.LEFT)
+        self.query_entry.bind("<Return>", lambda event: self.run_query())
+        tk.Button(query_frame, text="검색", command=self.run_query).pack(side=tk.LEFT)
+        tk.Button(query_frame, text="이전 결과", command=lambda: self.seek_match(-1)).pack(side=tk.LEFT)
+        tk.Button(query_frame, text="다음 결과", command=lambda: self.seek_match(1)).pack(side=tk.LEFT)
+        self.query_status = tk.Label(query_frame, text="")
+        self.query_status.pack(side=tk.LEFT)
+
+        # 번호로 바로 이동
+        self.jump_entry = tk.Entry(query_frame, width=7)
+        self.jump_entry.pack(side=tk.LEFT)
+        self.jump_entry.bind("<Return>", lambda event: self.jump_to())
+        tk.Button(query_frame, text="이동", command=self.jump_to).pack(side=tk.LEFT)
+
+        # 방향키를 누르고 있으면 연속으로 넘김 (입력창에서는 커서 이동)
+        self.root.bind("<Right>", lambda event: None if isinstance(event.widget, tk.Entry) else self.next_image())
+        self.root.bind("<Left>", lambda event: None if isinstance(event.widget, tk.Entry) else self.prev_image())
+
         self.image_files = []
         self.label_folder = ""
         self.current_index = -1
+        self.prefetcher = ImagePrefetcher(lambda path: render_preview(path, self.label_folder))
+
+        # 다른 작업자가 저장한 파일을 반영하기 위한 데이터셋 인덱스
+        self.dataset_index = None
+        self.index_changes = queue.Queue()
+        self.root.after(500, self.apply_index_changes)
+
+        # 검색용 라벨 인덱스 (파일이 바뀌면 다음 검색 때 다시 구성)
+        self.folder_path = None
+        self.query_index = None
+        self.matches = None
+        self.matches_stale = False  # 파일이 바뀌어 결과가 오래된 상태 (다음 이동/검색 때 다시 검색)
 
     def open_folder(self):
         # 폴더 선택 대화상자 열기
@@ -34,77 +395,195 @@ class YoloLabelViewer:
             self.label_folder = os.path.join(folder_path, "labels")
 
             if os.path.exists(image_folder) and os.path.exists(self.label_folder):
-                # 이미지 파일 목록 로드
-                self.image_files = [f for f in os.listdir(image_folder) if f.endswith((".jpg", ".jpeg", ".png"))]
+                # 이미지 파일 목록 로드 (이후 변경은 인덱스 이벤트로 반영)
+                if self.dataset_index is not None:
+                    self.dataset_index.remove_listener(self.on_index_change)
+                self.dataset_index = DatasetIndex.for_folder(folder_path)
+                self.dataset_index.add_listener(self.on_index_change)
+                self.index_changes = queue.Queue()
+                self.image_files = self.dataset_index.names("images", (".jpg", ".jpeg", ".png"))
                 self.image_folder = image_folder
+                self.folder_path = folder_path
+                self.query_index = None
+                self.matches = None
+                self.matches_stale = False
+                self.query_status.config(text="")
                 self.current_index = -1
+                self.prefetcher.clear()
 
                 if self.image_files:
                     self.next_button.config(state=tk.NORMAL)
+                    self.prev_button.config(state=tk.NORMAL)
+                    self.grid_button.config(state=tk.NORMAL)
+                    self.grid.set_items([self.image_path(i) for i in range(len(self.image_files))],
+                                        self.label_folder, os.path.join(folder_path, ".thumbnails"))
                     self.next_image()
                 else:
                     messagebox.showwarning("경고", "이미지 파일이 존재하지 않습니다.")
             else:
                 messagebox.showwarning("경고", "images 또는 labels 폴더가 존재하지 않습니다.")
 
+    def on_index_change(self, kind, added, removed):
+        # 감시 스레드에서 호출되므로 큐에만 넣고 화면 갱신은 메인 스레드에서 처리
+        self.index_changes.put((kind, added, removed))
+
+    def apply_index_changes(self):
+        changed = False
+        try:
+            while True:
+                kind, added, removed = self.index_changes.get_nowait()
+                if kind == "labels":
+                    # 라벨이 바뀐 이미지는 미리 준비한 결과를 버림
+                    stems = {os.path.splitext(name)[0] for name in added | removed}
+                    for image_file in self.image_files:
+                        if os.path.splitext(image_file)[0] in stems:
+                            self.prefetcher.discard(os.path.join(self.image_folder, image_file))
+                    changed = True
+                    continue
+                current = self.image_files[self.current_index] if 0 <= self.current_index < len(self.image_files) else None
+                names = set(self.image_files)
+                names -= removed
+                names |= {name for name in added if name.endswith((".jpg", ".jpeg", ".png"))}
+                self.image_files = sorted(names)
+                for name in added | removed:
+                    self.prefetcher.discard(os.path.join(self.image_folder, name))
+                # 보고 있던 이미지의 위치를 유지
+                if current in names:
+                    self.current_index = self.image_files.index(current)
+                else:
+                    self.current_index = min(self.current_index, len(self.image_files) - 1)
+                changed = True
+        except queue.Empty:
+            pass
+
+        if changed:
+            # 여기서 바로 다시 검색하면 다른 작업자가 저장할 때마다 라벨 캐시를 메인 스레드에서 다시 만들게 됨
+            self.query_index = None
+            if self.matches is not None:
+                self.matches_stale = True
+                self.update_query_status()
+            state = tk.NORMAL if self.image_files else tk.DISABLED
+            for button in (self.next_button, self.prev_button, self.grid_button):
+                button.config(state=state)
+            self.grid.update_items([self.image_path(i) for i in range(len(self.image_files))])
+        self.root.after(500, self.apply_index_changes)
+
     def next_image(self):
+        if not self.image_files:
+            return
         if self.current_index < len(self.image_files) - 1:
             self.current_index += 1
-            image_path = os.path.join(self.image_folder, self.image_files[self.current_index])
-            self.load_image(image_path)
+            self.load_image(self.image_path(self.current_index))
         else:
             messagebox.showinfo("정보", "더 이상 이미지가 없습니다.")
             self.next_button.config(state=tk.DISABLED)
 
+    def prev_image(self):
+        if self.current_index > 0:
+            self.current_index -= 1
+            self.next_button.config(state=tk.NORMAL)
+            self.load_image(self.image_path(self.current_index))
+
+    def toggle_grid(self):
+        if self.grid_visible:
+            self.grid.pack_forget()
+            self.canvas.pack(before=self.open_folder_button)
+        else:
+            self.canvas.pack_forget()
+            self.grid.pack(before=self.open_folder_button, fill=tk.BOTH, expand=True)
+            self.grid.layout()
+        self.grid_visible = not self.grid_visible
+
+    def select_from_grid(self, index):
+        # 격자에서 고른 이미지를 한 장 보기로 열기
+        self.toggle_grid()
+        self.show_index(index)
+
+    def run_query(self):
+        if not self.image_files:
+            return
+        text = self.query_entry.get().strip()
+        if not text:
+            self.matches = None
+            self.matches_stale = False
+            self.query_status.config(text="")
+            return
+        try:
+            if self.query_index is None:
+                class_path = os.path.join(self.folder_path, "classes.txt")
+                class_names = load_classes(class_path if os.path.exists(class_path) else "classes.txt")
+                self.query_index = LabelQueryIndex(self.folder_path, self.image_files, class_names)
+            self.matches = self.query_index.search(text)
+            self.matches_stale = False
+        except ValueError as e:
+            messagebox.showwarning("경고", str(e))
+            return
+        self.update_query_status()
+
+    def update_query_status(self):
+        if self.matches is None:
+            self.query_status.config(text="")
+            return
+        # 현재 이미지가 결과 중 몇 번째인지 표시
+        position = int(np.searchsorted(self.matches, self.current_index, side="right"))
+        current = position if position and self.matches[position - 1] == self.current_index else "-"
+        self.query_status.config(text=f"{current}/{len(self.matches)}" + (" (outdated)" if self.matches_stale else ""))
+
+    def seek_match(self, direction):
+        if self.matches_stale:
+            self.run_query()
+        if self.matches is None or not len(self.matches):
+            return
+        if direction > 0:
+            position = np.searchsorted(self.matches, self.current_index, side="right")
+            if position >= len(self.matches):
+                messagebox.showinfo("정보", "더 이상 결과가 없습니다.")
+                return
+        else:
+            position = np.searchsorted(self.matches, self.current_index, side="left") - 1
+            if position < 0:
+                messagebox.showinfo("정보", "이전 결과가 없습니다.")
+                return
+        self.show_index(int(self.matches[position]))
+
+    def jump_to(self):
+        try:
+            index = int(self.jump_entry.get()) - 1
+        except ValueError:
+            return
+        if 0 <= index < len(self.image_files):
+            self.show_index(index)
+
+    def show_index(self, index):
+        self.current_index = index
+        self.next_button.config(state=tk.NORMAL)
+        self.load_image(self.image_path(index))
+
+    def image_path(self, index):
+        return os.path.join(self.image_folder, self.image_files[index])
+
     def load_image(self, image_path):
-        # 이미지 로드
-        self.image = Image.open(image_path)
-        self.image.thumbnail((800, 600))
+        # 미리 준비된 이미지가 있으면 그대로 사용, 없으면 여기서 디코딩
+        self.image, has_labels = self.prefetcher.get(image_path)
         self.photo = ImageTk.PhotoImage(self.image)
 
         # 이미지 표시
+        self.canvas.delete("all")
         self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
 
-        # 라벨 파일 열기
-        self.open_labels(image_path)
-
-    def open_labels(self, image_path):
-        # YOLO 라벨 텍스트 파일 경로 추출
-        label_filename = os.path.splitext(os.path.basename(image_path))[0] + ".txt"
-        label_path = os.path.join(self.label_folder, label_filename)
-
-        if os.path.exists(label_path):
-            with open(label_path, "r") as file:
-                labels = file.readlines()
-
-            draw = ImageDraw.Draw(self.image)
-            width, height = self.image.size
-
-            # 라벨 좌표를 이미지 위에 그리기
-            for label in labels:
-                data = label.strip().split()
-                class_id = data[0]
-                x_center, y_center, w, h = map(float, data[1:])
-
-                # YOLO 좌표를 이미지 좌표로 변환
-                x_center *= width
-                y_center *= height
-                w *= width
-                h *= height
-
-                # 좌상단과 우하단 좌표 계산
-                x1 = x_center - w / 2
-                y1 = y_center - h / 2
-                x2 = x_center + w / 2
-                y2 = y_center + h / 2
-
-                # 바운딩 박스 그리기
-                draw.rectangle([x1, y1, x2, y2], outline="red", width=2)
-
-            # 다시 이미지 갱신
-            self.photo = ImageTk.PhotoImage(self.image)
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
-        else:
+        # 가까운 이미지부터 앞뒤로 미리 준비
+        nearby = []
+        for offset in range(1, PREFETCH_RADIUS + 1):
+            for index in (self.current_index + offset, self.current_index - offset):
+                if 0 <= index < len(self.image_files):
+                    nearby.append(self.image_path(index))
+        self.prefetcher.prefetch(nearby)
+        self.root.title(f"YOLO 라벨 확인 프로그램 - {self.current_index + 1}/{len(self.image_files)} "
+                        f"{os.path.basename(image_path)}")
+        self.update_query_status()
+
+        if not has_labels:
+            label_filename = os.path.splitext(os.path.basename(image_path))[0] + ".txt"
             messagebox.showwarning("경고", f"라벨 파일이 없습니다: {label_filename}")
 
 
@@ -1,15 +1,31 @@
 import sys
 import os
 import cv2
+import numpy as np
 from PyQt5.QtCore import Qt, QTimer, QPointF, QEvent
 from PyQt5.QtGui import QImage, QPixmap
-from PyQt5.QtWidgets import QInputDialog, QApplication, QComboBox, QLabel, QVBoxLayout, QWidget, QPushButton, QFileDialog, QListWidget, QLineEdit, QSplitter, QFrame, QSizePolicy, QScrollArea, QDockWidget, QMainWindow, QHBoxLayout, QMessageBox
+from PyQt5.QtWidgets import QInputDialog, QApplication, QComboBox, QLabel, QVBoxLayout, QWidget, QPushButton, QFileDialog, QListWidget, QLineEdit, QSplitter, QFrame, QSizePolicy, QScrollArea, QStackedWidget, QDockWidget, QMainWindow, QHBoxLayout, QMessageBox
 
 from ultralytics import YOLO
 
 from canvas import Canvas
+from tiles import TILED_MIN_PIXELS
+from scene_canvas import SceneCanvas
+from preview import PreviewSurface
 from preprocessing import Image_Preprocess
 from augmentation import ImageAugmentation  # 추가된 클래스
+from aug_pipeline import AugmentationPipeline
+from dataset_index import DatasetIndex
+from dataset_split import DatasetSplitter, write_dataset_yaml, read_dataset_paths
+from validator import DatasetValidator
+from label_store import LabelStore, summarize
+from class_registry import ClassRegistry
+import label_codec
+from exporters import CocoExporter
+from importers import DatasetImporter
+from jobs import Job, JobManager, JobsPanel
+
+CANVAS_RENDERER = "canvas"  # "canvas" (QPainter) 또는 "scene" (QGraphicsView/OpenGL, 박스가 많을 때)
 
 class AutoLabeler(QMainWindow):
     def __init__(self):
@@ -19,6 +35,7 @@ class AutoLabeler(QMainWindow):
         # Image_Preprocessing
         self.image_process = Image_Preprocess()
         self.image_augmenter = ImageAugmentation()  # 이미지 증강 클래스 인스턴스
+        self.job_manager = JobManager(self)  # 오래 걸리는 작업은 백그라운드에서 실행
         self.initUI()
         self.selected_camera = None
         self.timer = QTimer(self)
@@ -33,6 +50,11 @@ class AutoLabeler(QMainWindow):
         QApplication.instance().installEventFilter(self)
 
     def load_labels(self, filename):
+        # 클래스 변경 도중 종료된 경우 라벨 파일 변환을 마저 끝낸 뒤 목록을 읽음
+        registry = ClassRegistry(filename)
+        if registry.has_pending():
+            print("Resuming unfinished class change...")
+            registry.resume()
         with open(filename, "r") as f:
             return [line.strip() for line in f.readlines()]
 
@@ -41,15 +63,29 @@ class AutoLabeler(QMainWindow):
         self.setWindowTitle("Auto Labeler")
 
         # 중앙 위젯 설정 (캔버스)
-        self.canvas = Canvas(self.labels, self)
+        if CANVAS_RENDERER == "scene":
+            self.canvas = SceneCanvas(self.labels, self)
+        else:
+            self.canvas = Canvas(self.labels, self)
         self.canvas.setFrameStyle(QFrame.Box | QFrame.Raised)
         self.canvas.setLineWidth(2)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
-        scroll = QScrollArea()
-        scroll.setWidget(self.canvas)
-        scroll.setWidgetResizable(True)
-        self.setCentralWidget(scroll)
+        # 미리보기 중에는 프레임만 그리는 표시 영역, 캡처 후에만 라벨링 캔버스로 전환
+        self.preview = PreviewSurface()
+        self.view_stack = QStackedWidget()
+        self.view_stack.addWidget(self.preview)
+        if CANVAS_RENDERER == "scene":
+            # QGraphicsView 가 자체적으로 스크롤을 처리
+            self.view_stack.addWidget(self.canvas)
+            self.canvas_page = self.canvas
+        else:
+            scroll = QScrollArea()
+            scroll.setWidget(self.canvas)
+            scroll.setWidgetResizable(True)
+            self.view_stack.addWidget(scroll)
+            self.canvas_page = scroll
+        self.setCentralWidget(self.view_stack)
 
         # 사이드바 설정
         self.init_sidebar()
@@ -101,6 +137,35 @@ class AutoLabeler(QMainWindow):
         self.augmentation_button.clicked.connect(self.start_augmentation)
         sidebar_layout.addWidget(self.augmentation_button)
 
+        self.recipe_button = QPushButton("Augment with Recipe", self)
+        self.recipe_button.clicked.connect(self.start_recipe_augmentation)
+        sidebar_layout.addWidget(self.recipe_button)
+
+        # train/val/test 분할 버튼
+        self.split_button = QPushButton("Split Dataset", self)
+        self.split_button.clicked.connect(self.start_split)
+        sidebar_layout.addWidget(self.split_button)
+
+        self.validate_button = QPushButton("Validate Dataset", self)
+        self.validate_button.clicked.connect(self.start_validation)
+        sidebar_layout.addWidget(self.validate_button)
+
+        self.export_button = QPushButton("Export COCO", self)
+        self.export_button.clicked.connect(self.start_export)
+        sidebar_layout.addWidget(self.export_button)
+
+        self.import_coco_button = QPushButton("Import COCO", self)
+        self.import_coco_button.clicked.connect(self.start_import_coco)
+        sidebar_layout.addWidget(self.import_coco_button)
+
+        self.import_voc_button = QPushButton("Import VOC", self)
+        self.import_voc_button.clicked.connect(self.start_import_voc)
+        sidebar_layout.addWidget(self.import_voc_button)
+
+        self.stats_button = QPushButton("Dataset Stats", self)
+        self.stats_button.clicked.connect(self.start_stats)
+        sidebar_layout.addWidget(self.stats_button)
+
         sidebar_layout.addStretch()
 
         sidebar_widget = QWidget()
@@ -110,28 +175,209 @@ class AutoLabeler(QMainWindow):
         self.sidebar_dock.setWidget(sidebar_widget)
         self.addDockWidget(Qt.RightDockWidgetArea, self.sidebar_dock)
 
-    def get_rotation_parameters(self):
-        min_angle, ok = self.get_input_value("Enter minimum angle", "10")
-        if not ok:
-            return 10, 80, 10
+        # 작업 진행 상황 패널
+        self.jobs_dock = QDockWidget("Jobs", self)
+        self.jobs_dock.setWidget(JobsPanel(self.job_manager, self))
+        self.addDockWidget(Qt.RightDockWidgetArea, self.jobs_dock)
 
-        max_angle, ok = self.get_input_value("Enter maximum angle", "80")
-        if not ok:
-            return 10, 80, 10
+    def start_augmentation(self):
+        try:
+            process_folder = QFileDialog.getExistingDirectory(self, "Select Folder to Process")
+            if not process_folder:
+                return
+            save_folder = QFileDialog.getExistingDirectory(self, "Select Save Folder")
+            if not save_folder:
+                return
 
-        step, ok = self.get_input_value("Enter step angle", "10")
-        if not ok:
-            return 10, 80, 10
+            parameters = self.get_rotation_parameters()
+            if parameters is None:
+                return
+            min_angle, max_angle, step = parameters
+            self.register_dataset(save_folder)
+            self.job_manager.submit(Job(f"Augment {os.path.basename(process_folder)}",
+                                        self.image_augmenter.rotate_images,
+                                        min_angle, max_angle, step, process_folder, save_folder))
+        except Exception as e:
+            print(f"Error in start_augmentation: {e}")
+
+    def start_recipe_augmentation(self):
+        recipe_path, _ = QFileDialog.getOpenFileName(self, "Select Augmentation Recipe", "",
+                                                     "Recipes (*.yaml *.yml *.json)")
+        if not recipe_path:
+            return
+        process_folder = QFileDialog.getExistingDirectory(self, "Select Folder to Process")
+        if not process_folder:
+            return
+        save_folder = QFileDialog.getExistingDirectory(self, "Select Save Folder")
+        if not save_folder:
+            return
+
+        try:
+            pipeline = AugmentationPipeline.from_file(recipe_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load recipe: {e}")
+            return
+        self.register_dataset(save_folder)
+        self.job_manager.submit(Job(f"Augment {os.path.basename(process_folder)} ({os.path.basename(recipe_path)})",
+                                    pipeline.augment_images, process_folder, save_folder))
+
+    def start_validation(self):
+        dataset_folder = QFileDialog.getExistingDirectory(self, "Select Dataset Folder")
+        if not dataset_folder:
+            return
+
+        job = Job(f"Validate {os.path.basename(dataset_folder)}",
+                  DatasetValidator(dataset_folder, "classes.txt").validate)
+        job.summary = lambda result: f"{len(result[0])} issues"
+        job.finished.connect(self.show_validation_result)
+        self.job_manager.submit(job)
+
+    def show_validation_result(self, result):
+        issues, _ = result
+        if not issues:
+            QMessageBox.information(self, "Validate Dataset", "No issues found.")
+            return
+        lines = [f"{path}:{line_no}: {message}" for path, line_no, message in issues[:30]]
+        if len(issues) > 30:
+            lines.append(f"... and {len(issues) - 30} more")
+        QMessageBox.warning(self, "Validate Dataset", "\n".join(lines))
+
+    def start_export(self):
+        dataset_folder = QFileDialog.getExistingDirectory(self, "Select Dataset Folder")
+        if not dataset_folder:
+            return
+        output_path, _ = QFileDialog.getSaveFileName(self, "Save COCO JSON", "annotations.json", "JSON (*.json)")
+        if not output_path:
+            return
+
+        self.job_manager.submit(Job(f"Export {os.path.basename(dataset_folder)}",
+                                    CocoExporter(dataset_folder, "classes.txt").export, output_path))
+
+    def start_import_coco(self):
+        json_path, _ = QFileDialog.getOpenFileName(self, "Select COCO JSON", "", "JSON (*.json)")
+        if not json_path:
+            return
+        images_dir = QFileDialog.getExistingDirectory(self, "Select COCO Image Folder")
+        if not images_dir:
+            return
+        save_folder = QFileDialog.getExistingDirectory(self, "Select Save Folder")
+        if not save_folder:
+            return
+
+        self.register_dataset(save_folder)
+        job = Job(f"Import {os.path.basename(json_path)}",
+                  DatasetImporter(save_folder, "classes.txt").import_coco, json_path, images_dir)
+        job.summary = self.import_summary
+        job.finished.connect(self.reload_classes)
+        self.job_manager.submit(job)
+
+    def start_import_voc(self):
+        annotations_dir = QFileDialog.getExistingDirectory(self, "Select VOC Annotation Folder")
+        if not annotations_dir:
+            return
+        images_dir = QFileDialog.getExistingDirectory(self, "Select VOC Image Folder")
+        if not images_dir:
+            return
+        save_folder = QFileDialog.getExistingDirectory(self, "Select Save Folder")
+        if not save_folder:
+            return
+
+        self.register_dataset(save_folder)
+        job = Job(f"Import {os.path.basename(annotations_dir)}",
+                  DatasetImporter(save_folder, "classes.txt").import_voc, annotations_dir, images_dir)
+        job.summary = self.import_summary
+        job.finished.connect(self.reload_classes)
+        self.job_manager.submit(job)
+
+    def import_summary(self, result):
+        return f"{result['images']} images, {sum(result['skipped'].values())} skipped"
+
+    def reload_classes(self, result=None):
+        # 가져오기에서 새 클래스가 추가됐을 수 있으므로 캔버스와 공유하는 목록을 갱신
+        self.labels[:] = self.load_labels("classes.txt")
+
+    def register_dataset(self, dataset_folder):
+        # classes.txt 의 id 로 라벨을 쓰는 폴더를 기록해두면 클래스 삭제/병합 시 함께 변환됨
+        ClassRegistry("classes.txt").register_dataset(dataset_folder)
+
+    def start_stats(self):
+        dataset_folder = QFileDialog.getExistingDirectory(self, "Select Dataset Folder")
+        if not dataset_folder:
+            return
+
+        job = Job(f"Stats {os.path.basename(dataset_folder)}", LabelStore(dataset_folder).load_stats)
+        job.summary = lambda result: f"{len(result[2])} images, {len(result[1])} boxes"
+        job.finished.connect(self.show_stats)
+        self.job_manager.submit(job)
+
+    def show_stats(self, result):
+        names, boxes, image_names = result
+        QMessageBox.information(self, "Dataset Stats", summarize(names, boxes, self.labels, image_names))
 
-        return int(min_angle), int(max_angle), int(step)
+    def get_rotation_parameters(self):
+        # 입력을 취소하거나 숫자가 아니면 None (증강을 실행하지 않음)
+        values = []
+        for title, default_value in (("Enter minimum angle", 10), ("Enter maximum angle", 80),
+                                     ("Enter step angle", 10)):
+            value, ok = self.get_int_value(title, default_value)
+            if not ok or value is None:
+                return None
+            values.append(value)
+
+        min_angle, max_angle, step = values
+        if step <= 0 or min_angle > max_angle:
+            QMessageBox.warning(self, "Invalid Input", "Step must be positive and min angle must not exceed max angle.")
+            return None
+        return min_angle, max_angle, step
 
     def get_input_value(self, title, default_value):
         value, ok = QInputDialog.getText(self, title, "Value:", QLineEdit.Normal, default_value)
         return value, ok
 
+    def get_int_value(self, title, default_value):
+        """정수 입력, 숫자가 아니면 경고 후 (None, True) 반환"""
+        value, ok = self.get_input_value(title, str(default_value))
+        if not ok:
+            return None, False
+        try:
+            return int(value.strip()), True
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Input", f"'{value}' is not an integer.")
+            return None, True
+
+    def start_split(self):
+        try:
+            dataset_folder = QFileDialog.getExistingDirectory(self, "Select Dataset Folder")
+            if not dataset_folder:
+                return
+
+            seed, ok = self.get_int_value("Enter split seed", 0)
+            if not ok or seed is None:
+                return
+
+            self.register_dataset(dataset_folder)
+            splitter = DatasetSplitter(dataset_folder, ratios=(0.8, 0.1, 0.1), seed=seed)
+            self.job_manager.submit(Job(f"Split {os.path.basename(dataset_folder)}", splitter.split,
+                                        list(self.labels)))
+        except Exception as e:
+            print(f"Error in start_split: {e}")
+
+    def fit_canvas_to_view(self):
+        # 픽스맵은 그대로 두고 배율만 화면 크기에 맞춤
+        scroll_area_size = self.centralWidget().size()
+        pixmap_size = self.canvas.image_size
+        self.canvas.scale_factor = min(scroll_area_size.width() / pixmap_size.width(),
+                                       scroll_area_size.height() / pixmap_size.height())
+        self.canvas.resize(pixmap_size * self.canvas.scale_factor)
+        self.canvas.update_image_offset()
+        self.canvas.update()
+
     def reset_zoom(self):
         # 화면 크기에 맞게 이미지를 다시 스케일링
-        if self.canvas.pixmap:
+        image_size = self.canvas.image_size
+        if image_size is not None and image_size.width() * image_size.height() >= TILED_MIN_PIXELS:
+            self.fit_canvas_to_view()  # 원본 해상도로 불러온 큰 이미지는 배율만 되돌림 (박스 유지)
+        elif self.canvas.pixmap:
             scroll_area_size = self.centralWidget().size()
             scaled_pixmap = self.canvas.pixmap.scaled(scroll_area_size, Qt.KeepAspectRatio)
             self.canvas.load_pixmap(scaled_pixmap)
@@ -159,6 +405,7 @@ class AutoLabeler(QMainWindow):
 
         self.selected_camera = cv2.VideoCapture(index, cv2.CAP_DSHOW)
         if self.selected_camera.isOpened():
+            self.view_stack.setCurrentWidget(self.preview)
             self.timer.start(30)
             self.captured = False
         else:
@@ -173,20 +420,8 @@ class AutoLabeler(QMainWindow):
                     frame = self.image_process.apply_preprocessing(frame)
                     self.current_frame = frame
 
-                    # OpenCV 이미지를 RGB로 변환
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    image = QImage(frame_rgb, frame_rgb.shape[1], frame_rgb.shape[0], QImage.Format_RGB888)
-                    pixmap = QPixmap.fromImage(image)
-
-                    # 중앙 위젯(QScrollArea)의 크기에 맞게 이미지 스케일링
-                    scroll_area_size = self.centralWidget().size()
-                    scaled_pixmap = pixmap.scaled(scroll_area_size, Qt.KeepAspectRatio)
-
-                    # 캔버스에 스케일링된 이미지 로드
-                    self.canvas.load_pixmap(scaled_pixmap)
-
-                    # 캔버스 크기를 스케일링된 이미지 크기에 맞춤
-                    self.canvas.resize(scaled_pixmap.size())
+                    # 미리보기 표시 영역에만 그림 (캔버스 상태/위젯 크기는 그대로)
+                    self.preview.set_frame(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
 
         except Exception as e:
             print(f"Error in update_frame: {e}")
@@ -201,18 +436,26 @@ class AutoLabeler(QMainWindow):
                 captured_frame = self.current_frame.copy()  # current_frame을 복사하여 사용
                 captured_frame_rgb = cv2.cvtColor(captured_frame, cv2.COLOR_BGR2RGB)
                 image = QImage(captured_frame_rgb, captured_frame_rgb.shape[1], captured_frame_rgb.shape[0],
-                               QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(image)
+                               captured_frame_rgb.strides[0], QImage.Format_RGB888)
 
-                # 중앙 위젯(QScrollArea)의 크기에 맞게 이미지 스케일링
                 scroll_area_size = self.centralWidget().size()
-                scaled_pixmap = pixmap.scaled(scroll_area_size, Qt.KeepAspectRatio)
+                if image.width() * image.height() >= TILED_MIN_PIXELS:
+                    # 아주 큰 프레임은 원본 해상도 QImage 하나만 넘겨서 캔버스가 타일로 그리게 하고 배율로 화면에 맞춤
+                    # (numpy 버퍼를 참조하는 QImage 이므로 복사본을 넘김)
+                    self.canvas.load_image(image.copy())
+                    self.fit_canvas_to_view()
+                else:
+                    pixmap = QPixmap.fromImage(image)
+                    # 중앙 위젯(QScrollArea)의 크기에 맞게 이미지 스케일링
+                    scaled_pixmap = pixmap.scaled(scroll_area_size, Qt.KeepAspectRatio)
 
-                # 캔버스에 스케일링된 이미지 로드
-                self.canvas.load_pixmap(scaled_pixmap)
+                    # 캔버스에 스케일링된 이미지 로드 (앞서 큰 이미지에 맞춘 배율은 되돌림)
+                    self.canvas.scale_factor = 1.0
+                    self.canvas.load_pixmap(scaled_pixmap)
 
-                # 캔버스 크기를 스케일링된 이미지 크기에 맞춤
-                self.canvas.resize(scaled_pixmap.size())
+                    # 캔버스 크기를 스케일링된 이미지 크기에 맞춤
+                    self.canvas.resize(scaled_pixmap.size())
+                self.view_stack.setCurrentWidget(self.canvas_page)
 
                 # 객체 탐지 및 라벨링
                 if self.yolo_model:
@@ -223,7 +466,7 @@ class AutoLabeler(QMainWindow):
                             class_id = int(box.cls[0])
                             label_name = self.labels[class_id]
                             shape = [QPointF(x_min, y_min), QPointF(x_max, y_max)]
-                            self.canvas.shapes.append((shape, label_name))
+                            self.canvas.add_shape(shape, label_name)
                             self.canvas.labeling_done = True  # AI에 의한 라벨링도 완료로 설정
                             self.canvas.update()
 
@@ -238,6 +481,19 @@ class AutoLabeler(QMainWindow):
             if not hasattr(self, 'canvas') or not self.canvas.get_shapes():
                 return
 
+            # 라벨 파일 변환 중에는 예전 id 로 저장된 파일이 섞일 수 있으므로 저장하지 않음
+            if ClassRegistry("classes.txt").has_pending():
+                QMessageBox.warning(self, "Save", "Class changes are still being applied. Try again when the job finishes.")
+                return
+
+            # 이미지를 쓰기 전에 모든 박스의 클래스가 현재 목록에 있는지 확인
+            shapes = self.canvas.get_shapes()
+            unknown = sorted({label for _, label in shapes if label not in self.labels})
+            if unknown:
+                QMessageBox.warning(self, "Save", f"Unknown classes on the canvas: {', '.join(unknown)}")
+                return
+            class_ids = [self.labels.index(label) for _, label in shapes]
+
             if not self.output_folder:
                 self.output_folder = QFileDialog.getExistingDirectory(self, "Select Save Directory")
                 if not self.output_folder:
@@ -245,6 +501,7 @@ class AutoLabeler(QMainWindow):
                     self.reset_to_video_feed()
                     return
 
+            self.register_dataset(self.output_folder)
             images_folder = os.path.join(self.output_folder, "images")
             labels_folder = os.path.join(self.output_folder, "labels")
 
@@ -255,46 +512,48 @@ class AutoLabeler(QMainWindow):
             if not base_name:
                 base_name = "capture"
 
+            # 인덱스로 이미 쓰인 이름을 빠르게 건너뛰고, 인덱스가 늦게 반영된 경우를 위해 마지막에 디스크에서 확인
+            dataset_index = DatasetIndex.for_folder(self.output_folder)
             while True:
-                img_save_path = os.path.join(images_folder, f"{base_name}_{self.save_count}.jpg")
-                label_save_path = os.path.join(labels_folder, f"{base_name}_{self.save_count}.txt")
-                if not os.path.exists(img_save_path) and not os.path.exists(label_save_path):
-                    break
+                stem = f"{base_name}_{self.save_count}"
+                img_save_path = os.path.join(images_folder, f"{stem}.jpg")
+                label_save_path = os.path.join(labels_folder, f"{stem}.txt")
+                if not dataset_index.has_stem(stem) and not os.path.exists(label_save_path):
+                    try:
+                        # 다른 작업자가 같은 이름을 동시에 고르지 않도록 이미지 파일을 먼저 만들어 이름을 선점
+                        open(img_save_path, 'xb').close()
+                        break
+                    except FileExistsError:
+                        pass
                 self.save_count += 1
 
-            cv2.imwrite(img_save_path, self.current_frame)
+            if not cv2.imwrite(img_save_path, self.current_frame):
+                os.remove(img_save_path)  # 선점해 둔 빈 파일 정리
+                print(f"Error in save_yolo_format: failed to write {img_save_path}")
+                return
+            dataset_index.record(img_save_path)
 
             # 수정된 부분
-            img_size = (self.canvas.pixmap.height(), self.canvas.pixmap.width())
-
-            yolo_data = []
-            for shape, label in self.canvas.get_shapes():
-                x_min = min(shape[0].x(), shape[1].x())
-                y_min = min(shape[0].y(), shape[1].y())
-                x_max = max(shape[0].x(), shape[1].x())
-                y_max = max(shape[0].y(), shape[1].y())
-
-                x_center = (x_min + x_max) / 2 / img_size[1]
-                y_center = (y_min + y_max) / 2 / img_size[0]
-                width = (x_max - x_min) / img_size[1]
-                height = (y_max - y_min) / img_size[0]
-
-                label_index = self.labels.index(label)
-                yolo_data.append(f"{label_index} {x_center} {y_center} {width} {height}")
-
-            with open(label_save_path, 'w') as f:
-                f.write("\n".join(yolo_data))
-
-            yaml_path = os.path.join(self.output_folder, "dataset.yaml")
-            with open(yaml_path, 'w') as f:
-                yaml_content = f"""
-train: ./images
-val: ./images
-
-nc: {len(self.labels)}
-names: {self.labels}
-    """
-                f.write(yaml_content)
+            img_size = (self.canvas.image_size.height(), self.canvas.image_size.width())
+
+            points = np.array([[shape[0].x(), shape[0].y(), shape[1].x(), shape[1].y()] for shape, _ in shapes],
+                              dtype=float).reshape(-1, 4)
+            mins = np.minimum(points[:, 0:2], points[:, 2:4])
+            maxs = np.maximum(points[:, 0:2], points[:, 2:4])
+            image_wh = (img_size[1], img_size[0])
+            boxes = np.hstack([(mins + maxs) / 2 / image_wh, (maxs - mins) / image_wh])
+            label_codec.write(label_save_path, class_ids, boxes)
+            dataset_index.record(label_save_path)
+
+            # 분할로 생성된 train/val/test 경로가 있으면 유지하고, 새 캡처는 train 분할에도 연결
+            split_paths = read_dataset_paths(self.output_folder)
+            if split_paths.get('train', '').startswith('./splits/'):
+                DatasetSplitter(self.output_folder).add_sample(os.path.basename(img_save_path),
+                                                               os.path.basename(label_save_path), 'train')
+            write_dataset_yaml(self.output_folder, self.labels,
+                               train=split_paths.get('train', './images'),
+                               val=split_paths.get('val', './images'),
+                               test=split_paths.get('test'))
 
             self.save_count += 1
             self.reset_to_video_feed()
@@ -304,7 +563,7 @@ names: {self.labels}
 
     def reset_to_video_feed(self):
         self.current_frame = None
-        self.canvas.shapes = []
+        self.canvas.clear_shapes()
         self.canvas.labeling_done = False
         self.start_camera()
         self.captured = False
@@ -324,6 +583,9 @@ names: {self.labels}
                 # QMessageBox가 활성화된 경우 이벤트를 무시함
                 if any(isinstance(widget, QMessageBox) for widget in QApplication.topLevelWidgets()):
                     return False  # 이벤트 무시
+                # 클래스 선택 팝업이나 다른 모달 창이 열려 있으면 그 창이 Enter 를 처리
+                if QApplication.activePopupWidget() or QApplication.activeModalWidget():
+                    return False
 
                 if not self.captured:
                     self.capture_still()
@@ -337,6 +599,9 @@ names: {self.labels}
 
     def closeEvent(self, event):
         try:
+            self.job_manager.cancel_all()
+            self.job_manager.wait()
+            DatasetIndex.stop_all()
             if self.selected_camera is not None:
                 self.selected_camera.release()
         except Exception as e:
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import math
+import os
+import zlib
+
+import cv2
+import numpy as np
+
+import label_codec
+from augmentation import OUTPUT_VERSION, transform_boxes, collect_tasks, run_chunks, run_incremental
+
+
+GEOMETRIC_OPS = ('rotate', 'scale', 'translate', 'shear', 'hflip', 'vflip', 'perspective')
+PHOTOMETRIC_OPS = ('brightness', 'contrast', 'hsv', 'blur', 'noise')
+
+
+def load_recipe(recipe_path):
+    with open(recipe_path, 'r', encoding='utf-8') as f:
+        if recipe_path.endswith(('.yaml', '.yml')):
+            import yaml  # ultralytics 설치 시 함께 설치됨
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _sample(rng, value):
+    # [min, max] 는 균등 분포에서 샘플링, 스칼라는 그대로 사용
+    if isinstance(value, (list, tuple)):
+        return rng.uniform(value[0], value[1])
+    return value
+
+
+def _centered(matrix, cx, cy):
+    to_origin = np.array([[1, 0, -cx], [0, 1, -cy], [0, 0, 1]], dtype=float)
+    back = np.array([[1, 0, cx], [0, 1, cy], [0, 0, 1]], dtype=float)
+    return back @ matrix @ to_origin
+
+
+def geometric_matrix(op, rng, w, h):
+    """기하 변환 하나를 이미지 중심 기준의 3x3 행렬로 변환"""
+    kind = op['type']
+    cx, cy = w / 2, h / 2
+    if kind == 'rotate':
+        matrix = np.vstack([cv2.getRotationMatrix2D((cx, cy), _sample(rng, op.get('angle', 0)), 1.0), [0, 0, 1]])
+    elif kind == 'scale':
+        factor = _sample(rng, op.get('factor', 1.0))
+        matrix = _centered(np.diag([factor, factor, 1.0]), cx, cy)
+    elif kind == 'translate':
+        matrix = np.array([[1, 0, _sample(rng, op.get('x', 0)) * w],
+                           [0, 1, _sample(rng, op.get('y', 0)) * h],
+                           [0, 0, 1]], dtype=float)
+    elif kind == 'shear':
+        shear_x = math.tan(math.radians(_sample(rng, op.get('x', 0))))
+        shear_y = math.tan(math.radians(_sample(rng, op.get('y', 0))))
+        matrix = _centered(np.array([[1, shear_x, 0], [shear_y, 1, 0], [0, 0, 1]], dtype=float), cx, cy)
+    elif kind == 'hflip':
+        matrix = np.array([[-1, 0, w], [0, 1, 0], [0, 0, 1]], dtype=float)
+    elif kind == 'vflip':
+        matrix = np.array([[1, 0, 0], [0, -1, h], [0, 0, 1]], dtype=float)
+    elif kind == 'perspective':
+        # 네 모서리를 이미지 크기 대비 distortion 비율 안에서 무작위 이동
+        distortion = _sample(rng, op.get('distortion', 0.05))
+        src = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+        jitter = rng.uniform(-distortion, distortion, size=(4, 2)) * [w, h]
+        matrix = cv2.getPerspectiveTransform(src, np.float32(src + jitter)).astype(float)
+    else:
+        raise ValueError(f"Unknown geometric op: {kind}")
+    return matrix
+
+
+def apply_photometric(op, rng, image):
+    kind = op['type']
+    if kind == 'brightness':
+        return cv2.convertScaleAbs(image, alpha=1, beta=_sample(rng, op.get('beta', 0)))
+    if kind == 'contrast':
+        return cv2.convertScaleAbs(image, alpha=_sample(rng, op.get('alpha', 1.0)), beta=0)
+    if kind == 'hsv':
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV).astype(np.float32)
+        hsv[..., 0] = (hsv[..., 0] + _sample(rng, op.get('hue', 0))) % 180
+        hsv[..., 1] *= _sample(rng, op.get('saturation', 1.0))
+        hsv[..., 2] *= _sample(rng, op.get('value', 1.0))
+        return cv2.cvtColor(np.clip(hsv, 0, 255).astype(np.uint8), cv2.COLOR_HSV2BGR)
+    if kind == 'blur':
+        ksize = int(op.get('ksize', 3)) | 1
+        return cv2.GaussianBlur(image, (ksize, ksize), 0)
+    if kind == 'noise':
+        noise = rng.normal(0, _sample(rng, op.get('sigma', 5)), size=image.shape)
+        return np.clip(image + noise, 0, 255).astype(np.uint8)
+    raise ValueError(f"Unknown photometric op: {kind}")
+
+
+class AugmentationPipeline:
+    def __init__(self, recipe):
+        self.seed = int(recipe.get('seed', 0))
+        self.variants = int(recipe.get('variants', 1))
+        self.ops = recipe.get('ops', [])
+        self.recipe_id = hashlib.sha1(json.dumps(recipe, sort_keys=True).encode('utf-8')).hexdigest()
+        for op in self.ops:
+            if op.get('type') not in GEOMETRIC_OPS + PHOTOMETRIC_OPS:
+                raise ValueError(f"Unknown augmentation op: {op.get('type')}")
+
+    @classmethod
+    def from_file(cls, recipe_path):
+        return cls(load_recipe(recipe_path))
+
+    def rng_for(self, name, variant):
+        # 시드, 파일 이름, 변형 번호로 난수 생성기를 고정해서 실행 순서와 무관하게 재현
+        return np.random.default_rng([self.seed, zlib.crc32(name.encode('utf-8')), variant])
+
+    def apply(self, image, class_ids, boxes, rng):
+        """연속된 기하 변환은 행렬 하나로 합쳐서 한 번만 리샘플링"""
+        h, w = image.shape[:2]
+        matrix = np.eye(3)
+        for op in self.ops:
+            if rng.uniform() >= op.get('p', 1.0):
+                continue
+            if op['type'] in GEOMETRIC_OPS:
+                matrix = geometric_matrix(op, rng, w, h) @ matrix
+            else:
+                image, boxes, matrix = self._flush(image, boxes, matrix)
+                image = apply_photometric(op, rng, image)
+        image, boxes, _ = self._flush(image, boxes, matrix)
+
+        # 이미지 밖으로 완전히 나간 박스 제거
+        keep = (boxes[:, 2] > 0) & (boxes[:, 3] > 0)
+        return image, class_ids[keep], boxes[keep]
+
+    def _flush(self, image, boxes, matrix):
+        if np.allclose(matrix, np.eye(3)):
+            return image, boxes, matrix
+        h, w = image.shape[:2]
+        # 행렬은 픽셀 경계 좌표계 기준, OpenCV 는 픽셀 중심 좌표계라서 0.5 만큼 보정
+        pixel_matrix = _centered(matrix, -0.5, -0.5)
+        if np.allclose(matrix[2], [0, 0, 1]):
+            image = cv2.warpAffine(image, pixel_matrix[:2], (w, h))
+            matrices = matrix[None, :2]
+        else:
+            image = cv2.warpPerspective(image, pixel_matrix, (w, h))
+            matrices = matrix[None]
+        boxes = transform_boxes(boxes, w, h, matrices, np.array([[w, h]]))[0]
+        return image, boxes, np.eye(3)
+
+    def augment_images(self, process_folder, save_folder, workers=None, chunk_size=16, progress_callback=None,
+                       incremental=True):
+        save_image_folder = os.path.join(save_folder, 'images')
+        save_label_folder = os.path.join(save_folder, 'labels')
+        os.makedirs(save_image_folder, exist_ok=True)
+        os.makedirs(save_label_folder, exist_ok=True)
+
+        variants = list(range(self.variants))
+        if incremental:
+            return run_incremental(_augment_chunk, process_folder, variants, '{}_aug{}',
+                                   f'recipe:v{OUTPUT_VERSION}:' + self.recipe_id, save_folder, (self,), workers,
+                                   chunk_size, progress_callback)
+
+        tasks = [(img_path, label_path, variants, save_image_folder, save_label_folder, self)
+                 for img_path, label_path in collect_tasks(process_folder)]
+        return run_chunks(_augment_chunk, tasks, workers, chunk_size, progress_callback)
+
+
+def _augment_chunk(tasks):
+    written = 0
+    for img_path, label_path, variants, save_image_folder, save_label_folder, pipeline in tasks:
+        img = cv2.imread(img_path)
+        if img is None:
+            continue
+        class_ids, boxes = label_codec.read(label_path)
+
+        img_name = os.path.basename(img_path)
+        base_name = os.path.splitext(img_name)[0]
+        for variant in variants:
+            rng = pipeline.rng_for(img_name, variant)
+            aug_img, aug_class_ids, aug_boxes = pipeline.apply(img, class_ids, boxes, rng)
+
+            cv2.imwrite(os.path.join(save_image_folder, f'{base_name}_aug{variant}.jpg'), aug_img)
+            label_codec.write(os.path.join(save_label_folder, f'{base_name}_aug{variant}.txt'),
+                              aug_class_ids, aug_boxes)
+            written += 1
+    return len(tasks), written
@@ -1,116 +1,282 @@
 import cv2
+import hashlib
+import json
 import os
+import time
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+import label_codec
+from dataset_index import DatasetIndex
 
-class ImageAugmentation:
-    def __init__(self):
-        pass
 
-    def rotate_images(self, min_angle, max_angle, step, process_folder, save_folder):
-        image_folder = os.path.join(process_folder, 'images')
-        label_folder = os.path.join(process_folder, 'labels')
+# 라벨 출력 형식이 바뀌면 올려서 증분 실행 시 기존 출력을 다시 생성
+OUTPUT_VERSION = 2
 
-        save_image_folder = os.path.join(save_folder, 'images')
-        save_label_folder = os.path.join(save_folder, 'labels')
 
-        os.makedirs(save_image_folder, exist_ok=True)
-        os.makedirs(save_label_folder, exist_ok=True)
+def _init_worker():
+    # 프로세스마다 OpenCV 내부 스레드를 1개로 제한 (코어 과점유 방지)
+    cv2.setNumThreads(1)
 
-        angles = range(min_angle, max_angle + 1, step)
 
-        for img_name in os.listdir(image_folder):
-            if img_name.endswith(('.jpg', '.png')):
-                img_path = os.path.join(image_folder, img_name)
-                img = cv2.imread(img_path)
+def _rotate_chunk(tasks):
+    written = 0
+    for img_path, label_path, angles, save_image_folder, save_label_folder in tasks:
+        img = cv2.imread(img_path)
+        if img is None:
+            continue
+        class_ids, boxes = label_codec.read(label_path)
 
-                label_name = os.path.splitext(img_name)[0] + '.txt'
-                label_path = os.path.join(label_folder, label_name)
+        # 이미지 한 번 디코딩 후 모든 각도에 재사용, 라벨은 모든 각도를 한 번에 변환
+        img_base = os.path.splitext(os.path.basename(img_path))[0]
+        label_base = os.path.splitext(os.path.basename(label_path))[0]
+        h, w = img.shape[:2]
+        matrices, sizes = rotation_matrices(w, h, angles)
+        rotated_boxes = transform_boxes(boxes, w, h, matrices, sizes)
 
-                if os.path.exists(label_path):
-                    with open(label_path, 'r') as label_file:
-                        labels = label_file.readlines()
+        for i, angle in enumerate(angles):
+            new_w, new_h = sizes[i]
+            rotated_img = cv2.warpAffine(img, matrices[i], (int(new_w), int(new_h)))
 
-                    for angle in angles:
-                        # 이미지 및 라벨 회전
-                        rotated_img, rotated_labels = self.rotate_image_and_labels(img, labels, angle)
+            save_img_path = os.path.join(save_image_folder, f'{img_base}_rot{angle}.jpg')
+            cv2.imwrite(save_img_path, rotated_img)
 
-                        # 회전된 이미지 저장
-                        save_img_path = os.path.join(save_image_folder,
-                                                     f'{os.path.splitext(img_name)[0]}_rot{angle}.jpg')
-                        cv2.imwrite(save_img_path, rotated_img)
+            save_label_path = os.path.join(save_label_folder, f'{label_base}_rot{angle}.txt')
+            label_codec.write(save_label_path, class_ids, rotated_boxes[i])
+            written += 1
+    return len(tasks), written
 
-                        # 회전된 라벨 저장
-                        save_label_path = os.path.join(save_label_folder,
-                                                       f'{os.path.splitext(label_name)[0]}_rot{angle}.txt')
-                        with open(save_label_path, 'w') as new_label_file:
-                            new_label_file.writelines(rotated_labels)
 
-    def rotate_image_and_labels(self, image, labels, angle):
-        h, w = image.shape[:2]
-        center = (w // 2, h // 2)
+def rotation_matrices(w, h, angles):
+    """각도별 회전 행렬 (A, 2, 3) 과 회전 후 이미지 크기 (A, 2) 계산"""
+    center = (w // 2, h // 2)
+    matrices = np.stack([cv2.getRotationMatrix2D(center, angle, 1.0) for angle in angles])
+    cos_val = np.abs(matrices[:, 0, 0])
+    sin_val = np.abs(matrices[:, 0, 1])
+
+    # 회전된 이미지의 새로운 크기 계산
+    new_w = ((h * sin_val) + (w * cos_val)).astype(int)
+    new_h = ((h * cos_val) + (w * sin_val)).astype(int)
+
+    # 회전 행렬의 이동 추가
+    matrices[:, 0, 2] += (new_w / 2) - center[0]
+    matrices[:, 1, 2] += (new_h / 2) - center[1]
+    return matrices, np.stack([new_w, new_h], axis=1)
+
+
+def parse_labels(labels):
+    """YOLO 라벨 라인들을 class id (N,) 와 박스 (N, 4) 배열로 한 번에 변환"""
+    return label_codec.parse("\n".join(labels))
+
+
+def transform_boxes(boxes, w, h, matrices, sizes):
+    """박스 (N, 4) 를 모든 행렬 (A, 2, 3) 또는 원근 행렬 (A, 3, 3) 로 한 번에 변환해서 정규화된 박스 (A, N, 4) 반환"""
+    if len(boxes) == 0:
+        return np.zeros((len(matrices), 0, 4))
+
+    # 실제 좌표의 모서리 4개 (N, 4, 3) 를 동차 좌표로 구성
+    x_center, y_center = boxes[:, 0] * w, boxes[:, 1] * h
+    half_w, half_h = boxes[:, 2] * w / 2, boxes[:, 3] * h / 2
+    xs = np.stack([x_center - half_w, x_center + half_w, x_center + half_w, x_center - half_w], axis=1)
+    ys = np.stack([y_center - half_h, y_center - half_h, y_center + half_h, y_center + half_h], axis=1)
+    corners_hom = np.stack([xs, ys, np.ones_like(xs)], axis=2)
+
+    # (A, 2, 3) x (N, 4, 3) -> (A, N, 4, 2)
+    transformed = np.einsum('aij,nkj->anki', matrices, corners_hom)
+    if transformed.shape[-1] == 3:
+        transformed = transformed[..., :2] / transformed[..., 2:]
+
+    new_size = sizes[:, None, :].astype(float)
+    mins = np.clip(transformed.min(axis=2), 0, new_size)
+    maxs = np.clip(transformed.max(axis=2), 0, new_size)
+
+    # 새 좌표를 YOLO 형식으로 정규화
+    centers = (mins + maxs) / 2 / new_size
+    extents = (maxs - mins) / new_size
+    return np.concatenate([centers, extents], axis=2)
+
+
+def format_labels(class_ids, boxes):
+    return label_codec.format_labels(class_ids, boxes).decode('ascii').splitlines()
+
 
-        # 회전 행렬 계산
-        matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
-        cos_val = np.abs(matrix[0, 0])
-        sin_val = np.abs(matrix[0, 1])
+def rotate_image_and_labels(image, labels, angle):
+    h, w = image.shape[:2]
+    matrices, sizes = rotation_matrices(w, h, [angle])
+    new_w, new_h = sizes[0]
 
-        # 회전된 이미지의 새로운 크기 계산
-        new_w = int((h * sin_val) + (w * cos_val))
-        new_h = int((h * cos_val) + (w * sin_val))
+    # 이미지 회전
+    rotated_img = cv2.warpAffine(image, matrices[0], (int(new_w), int(new_h)))
 
-        # 회전 행렬의 이동 추가
-        matrix[0, 2] += (new_w / 2) - center[0]
-        matrix[1, 2] += (new_h / 2) - center[1]
+    class_ids, boxes = parse_labels(labels)
+    rotated_boxes = transform_boxes(boxes, w, h, matrices, sizes)
+    return rotated_img, format_labels(class_ids, rotated_boxes[0])
 
-        # 이미지 회전
-        rotated_img = cv2.warpAffine(image, matrix, (new_w, new_h))
 
-        rotated_labels = []
+def collect_tasks(process_folder):
+    """(이미지 경로, 라벨 경로) 목록, 라벨이 있는 이미지만 이름순으로"""
+    # 폴더를 매번 다시 읽지 않고 공유 인덱스에서 조회
+    return DatasetIndex.for_folder(process_folder).pairs(('.jpg', '.png'))
 
-        for label in labels:
-            class_id, x_center, y_center, width, height = map(float, label.strip().split())
 
-            x_center_actual = x_center * w
-            y_center_actual = y_center * h
-            box_width_actual = width * w
-            box_height_actual = height * h
+def run_chunks(worker, tasks, workers=None, chunk_size=16, progress_callback=None):
+    """청크 단위로 프로세스 풀에 분배, worker 는 (처리한 입력 수, 기록한 출력 수) 반환"""
+    # 출력 파일은 입력별로 고정이라 결과가 워커 수와 무관
+    total = len(tasks)
+    done = 0
+    written = 0
+    start_time = time.time()
+    chunks = [tasks[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(worker, chunk) for chunk in chunks]
+        try:
+            for future in as_completed(futures):
+                chunk_done, chunk_written = future.result()
+                done += chunk_done
+                written += chunk_written
+                rate = done / max(time.time() - start_time, 1e-6)
+                if progress_callback:
+                    progress_callback(done, total, rate)
+                else:
+                    print(f"Augmentation: {done}/{total} images ({rate:.1f} images/s)")
+        except BaseException:
+            # 취소 또는 오류 시 아직 시작하지 않은 청크는 실행하지 않음
+            for future in futures:
+                future.cancel()
+            raise
+    return written
 
-            xmin = x_center_actual - box_width_actual / 2
-            xmax = x_center_actual + box_width_actual / 2
-            ymin = y_center_actual - box_height_actual / 2
-            ymax = y_center_actual + box_height_actual / 2
 
-            corners = np.array([
-                [xmin, ymin],
-                [xmax, ymin],
-                [xmax, ymax],
-                [xmin, ymax]
-            ])
+class AugmentationManifest:
+    """증강 결과 기록: 출력 이름 -> (원본 이름, 원본 해시, 레시피), 재실행 시 바뀐 원본만 처리"""
 
-            ones = np.ones(shape=(len(corners), 1))
-            corners_hom = np.hstack([corners, ones])
-            rotated_corners = matrix.dot(corners_hom.T).T
+    def __init__(self, save_folder):
+        self.path = os.path.join(save_folder, '.augment_manifest.json')
+        self.save_image_folder = os.path.join(save_folder, 'images')
+        self.save_label_folder = os.path.join(save_folder, 'labels')
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.sources = data.get('sources', {})
+        self.outputs = data.get('outputs', {})
 
-            x_coords = rotated_corners[:, 0]
-            y_coords = rotated_corners[:, 1]
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'sources': self.sources, 'outputs': self.outputs}, f)
+        os.replace(tmp_path, self.path)
 
-            new_xmin = np.min(x_coords)
-            new_xmax = np.max(x_coords)
-            new_ymin = np.min(y_coords)
-            new_ymax = np.max(y_coords)
+    def source_hash(self, img_path, label_path):
+        # 크기와 mtime 이 그대로면 저장된 해시 재사용, 아니면 이미지+라벨 내용으로 다시 계산
+        img_stat = os.stat(img_path)
+        label_stat = os.stat(label_path)
+        stamp = [img_stat.st_size, img_stat.st_mtime_ns, label_stat.st_size, label_stat.st_mtime_ns]
+        key = os.path.abspath(img_path)  # 여러 원본 폴더가 같은 저장 폴더를 쓸 수 있으므로 전체 경로로 구분
+        entry = self.sources.get(key)
+        if entry and entry['stamp'] == stamp:
+            return entry['hash']
 
-            new_x_center_actual = (new_xmin + new_xmax) / 2
-            new_y_center_actual = (new_ymin + new_ymax) / 2
-            new_box_width_actual = new_xmax - new_xmin
-            new_box_height_actual = new_ymax - new_ymin
+        digest = hashlib.sha1()
+        for path in (img_path, label_path):
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        self.sources[key] = {'stamp': stamp, 'hash': digest.hexdigest()}
+        return self.sources[key]['hash']
 
-            new_x_center = new_x_center_actual / new_w
-            new_y_center = new_y_center_actual / new_h
-            new_width = new_box_width_actual / new_w
-            new_height = new_box_height_actual / new_h
+    def is_current(self, stem, source_folder, source_hash, recipe_id):
+        entry = self.outputs.get(stem)
+        return (entry is not None and entry.get('folder') == source_folder and entry['hash'] == source_hash and
+                entry['recipe'] == recipe_id and
+                os.path.exists(os.path.join(self.save_image_folder, stem + '.jpg')) and
+                os.path.exists(os.path.join(self.save_label_folder, stem + '.txt')))
 
-            rotated_label = f"{class_id} {new_x_center} {new_y_center} {new_width} {new_height}"
-            rotated_labels.append(rotated_label)
+    def record(self, stem, source_folder, source_name, source_hash, recipe_id):
+        self.outputs[stem] = {'folder': source_folder, 'source': source_name, 'hash': source_hash,
+                              'recipe': recipe_id}
 
-        return rotated_img, rotated_labels
+    def prune(self, source_folder, source_paths):
+        """source_folder 에서 원본이 삭제된 출력 파일 제거 (다른 원본 폴더의 출력은 그대로 둠)"""
+        source_names = {os.path.basename(path) for path in source_paths}
+        removed = 0
+        for stem, entry in list(self.outputs.items()):
+            # 폴더 기록이 없는 예전 항목은 어느 폴더 것인지 알 수 없으므로 지우지 않음
+            if entry.get('folder') != source_folder or entry['source'] in source_names:
+                continue
+            for path in (os.path.join(self.save_image_folder, stem + '.jpg'),
+                         os.path.join(self.save_label_folder, stem + '.txt')):
+                if os.path.exists(path):
+                    os.remove(path)
+            del self.outputs[stem]
+            removed += 1
+        source_keys = {os.path.abspath(path) for path in source_paths}
+        prefix = os.path.join(source_folder, '')
+        for key in list(self.sources):
+            # 예전 이름 기준 항목과 이 폴더에서 삭제된 원본의 해시 캐시 제거
+            if not os.path.isabs(key) or (key.startswith(prefix) and key not in source_keys):
+                del self.sources[key]
+        return removed
+
+
+def run_incremental(worker, process_folder, variants, stem_format, recipe_id, save_folder, extra=(),
+                    workers=None, chunk_size=16, progress_callback=None):
+    """manifest 기준으로 필요한 (원본, 변형) 만 처리하고 결과를 기록"""
+    save_image_folder = os.path.join(save_folder, 'images')
+    save_label_folder = os.path.join(save_folder, 'labels')
+    source_folder = os.path.abspath(process_folder)
+    sources = collect_tasks(process_folder)
+    manifest = AugmentationManifest(save_folder)
+
+    tasks = []
+    planned = []
+    for img_path, label_path in sources:
+        base_name = os.path.splitext(os.path.basename(img_path))[0]
+        source_hash = manifest.source_hash(img_path, label_path)
+        todo = [v for v in variants
+                if not manifest.is_current(stem_format.format(base_name, v), source_folder, source_hash, recipe_id)]
+        if todo:
+            tasks.append((img_path, label_path, todo, save_image_folder, save_label_folder) + extra)
+            planned.append((os.path.basename(img_path), base_name, source_hash, todo))
+
+    written = run_chunks(worker, tasks, workers, chunk_size, progress_callback)
+
+    for source_name, base_name, source_hash, todo in planned:
+        for v in todo:
+            manifest.record(stem_format.format(base_name, v), source_folder, source_name, source_hash, recipe_id)
+    manifest.prune(source_folder, [img_path for img_path, _ in sources])
+    manifest.save()
+    return written
+
+
+class ImageAugmentation:
+    def __init__(self, workers=None, chunk_size=16):
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    def rotate_images(self, min_angle, max_angle, step, process_folder, save_folder, progress_callback=None,
+                      incremental=True):
+        return self.rotate_angles(list(range(min_angle, max_angle + 1, step)), process_folder, save_folder,
+                                  progress_callback, incremental)
+
+    def rotate_angles(self, angles, process_folder, save_folder, progress_callback=None, incremental=True):
+        """임의의 각도 목록으로 회전 증강"""
+        save_image_folder = os.path.join(save_folder, 'images')
+        save_label_folder = os.path.join(save_folder, 'labels')
+
+        os.makedirs(save_image_folder, exist_ok=True)
+        os.makedirs(save_label_folder, exist_ok=True)
+
+        angles = list(angles)
+        if incremental:
+            return run_incremental(_rotate_chunk, process_folder, angles, '{}_rot{}',
+                                   f'rotate:v{OUTPUT_VERSION}', save_folder, (), self.workers, self.chunk_size,
+                                   progress_callback)
+
+        tasks = [(img_path, label_path, angles, save_image_folder, save_label_folder)
+                 for img_path, label_path in collect_tasks(process_folder)]
+        return run_chunks(_rotate_chunk, tasks, self.workers, self.chunk_size, progress_callback)
+
+    def rotate_image_and_labels(self, image, labels, angle):
+        return rotate_image_and_labels(image, labels, angle)
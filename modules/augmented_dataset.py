@@ -0,0 +1,104 @@
+import os
+from collections import OrderedDict
+
+import cv2
+
+import label_codec
+from augmentation import ImageAugmentation, collect_tasks, rotation_matrices, transform_boxes
+
+
+CACHE_BYTES = 256 * 1024 * 1024  # 생성한 샘플 캐시 한도 (HD 이미지 기준 수십 장)
+
+
+def _copy_sample(sample):
+    return tuple(part.copy() for part in sample)
+
+
+class AugmentedDataset:
+    """원본만 두고 (원본, 변형) 조합을 필요할 때 생성하는 지연 증강 데이터셋"""
+
+    def __init__(self, dataset_folder, pipeline=None, angles=None, cache_bytes=CACHE_BYTES):
+        if (pipeline is None) == (angles is None):
+            raise ValueError("Either pipeline or angles must be given")
+        self.dataset_folder = dataset_folder
+        self.pipeline = pipeline
+        self.angles = list(angles) if angles is not None else None
+        self.variants = pipeline.variants if pipeline is not None else len(self.angles)
+        self.sources = collect_tasks(dataset_folder)
+        self.cache_bytes = cache_bytes
+        self.cache_used = 0
+        self.cache = OrderedDict()
+        self._source_index = None
+        self._source = None
+
+    @classmethod
+    def from_rotation(cls, dataset_folder, min_angle, max_angle, step, cache_bytes=CACHE_BYTES):
+        return cls(dataset_folder, angles=range(min_angle, max_angle + 1, step), cache_bytes=cache_bytes)
+
+    def __len__(self):
+        return len(self.sources) * self.variants
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def name(self, index):
+        source_index, variant = divmod(index, self.variants)
+        base_name = os.path.splitext(os.path.basename(self.sources[source_index][0]))[0]
+        if self.angles is not None:
+            return f'{base_name}_rot{self.angles[variant]}'
+        return f'{base_name}_aug{variant}'
+
+    def __getitem__(self, index):
+        """(이미지, class id 배열, 정규화된 박스 배열) 반환, 호출한 쪽이 자유롭게 수정해도 되는 복사본"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return _copy_sample(self.cache[index])
+
+        source_index, variant = divmod(index, self.variants)
+        image, class_ids, boxes = self._load_source(source_index)
+        if self.angles is not None:
+            h, w = image.shape[:2]
+            matrices, sizes = rotation_matrices(w, h, [self.angles[variant]])
+            new_w, new_h = sizes[0]
+            sample = (cv2.warpAffine(image, matrices[0], (int(new_w), int(new_h))),
+                      class_ids, transform_boxes(boxes, w, h, matrices, sizes)[0])
+        else:
+            img_name = os.path.basename(self.sources[source_index][0])
+            sample = self.pipeline.apply(image, class_ids, boxes, self.pipeline.rng_for(img_name, variant))
+
+        # 이미지 크기가 제각각이므로 개수가 아니라 바이트 수로 제한
+        size = sum(part.nbytes for part in sample)
+        if size <= self.cache_bytes:
+            self.cache[index] = sample
+            self.cache_used += size
+            while self.cache_used > self.cache_bytes:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_used -= sum(part.nbytes for part in evicted)
+        # 캐시에 든 배열이나 원본 배열(변환이 없는 경우)을 그대로 넘기면 제자리 수정이 다음 조회에 섞여 들어감
+        return _copy_sample(sample)
+
+    def _load_source(self, source_index):
+        # 같은 원본의 변형들은 인덱스가 연속이므로 마지막 원본 하나만 유지해도 디코딩이 한 번으로 끝남
+        if self._source_index != source_index:
+            img_path, label_path = self.sources[source_index]
+            image = cv2.imread(img_path)
+            if image is None:
+                raise IOError(f"Failed to read image: {img_path}")
+            class_ids, boxes = label_codec.read(label_path)
+            self._source_index = source_index
+            self._source = (image, class_ids, boxes)
+        return self._source
+
+    def export(self, save_folder, workers=None, progress_callback=None):
+        """디스크에 모든 변형을 저장 (기존 증강과 같은 파일 이름)"""
+        if self.angles is not None:
+            return ImageAugmentation(workers=workers).rotate_angles(self.angles, self.dataset_folder, save_folder,
+                                                                    progress_callback)
+        return self.pipeline.augment_images(self.dataset_folder, save_folder, workers=workers,
+                                            progress_callback=progress_callback)
@@ -1,14 +1,20 @@
-from PyQt5.QtCore import Qt, QPointF, QRectF
-from PyQt5.QtGui import QColor, QPainter, QPen
+import math
+
+from PyQt5.QtCore import Qt, QPointF, QRectF, QRect, QSizeF, QTimer
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap, QStaticText, QTransform
 from PyQt5.QtWidgets import QFrame
-from labelbox import LabelDialog
+from class_picker import ClassPicker
+from spatial_index import ShapeGrid
+from tiles import TilePyramid, TILED_MIN_PIXELS
 
 
 class Canvas(QFrame):
     def __init__(self, labels, parent=None):
         super(Canvas, self).__init__(parent)
         self.labels = labels
+        self.class_picker = ClassPicker(labels, self)  # 박스마다 다이얼로그를 새로 만들지 않고 재사용
         self.pixmap = None
+        self.image_size = None  # 원본 이미지 크기 (아주 큰 이미지는 픽스맵 없이 타일용 QImage 만 유지)
         self.shapes = []
         self.current_shape = None
         self.drawing = False
@@ -22,67 +28,206 @@ class Canvas(QFrame):
         self.setFocusPolicy(Qt.StrongFocus)
         self.hovered_vertex = None
         self.vertex_radius = 5
+
+        # 꼭지점/내부 판정용 공간 인덱스 (shapes 가 외부에서 바뀌면 동기화 시 다시 구성)
+        self.shape_index = ShapeGrid(cell_size=64, margin=self.vertex_radius * 2)
+        self.shape_order = {}
+        self.indexed_shapes = None
+        self.indexed_count = 0
         self.labeling_done = False  # 라벨링 완료 여부 변수 추가
 
         # 패닝 관련 변수 추가
         self.panning = False
         self.last_mouse_position = None
 
+        # 스케일링된 픽스맵 캐시 (픽스맵과 배율이 바뀔 때만 다시 계산)
+        self.scaled_pixmap = None
+        self.scaled_pixmap_key = None
+        self.interacting = False  # 줌 조작 중에는 빠른 변환 사용
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(150)
+        self.refine_timer.timeout.connect(self.refine_pixmap)
+
+        # 아주 큰 이미지는 타일 피라미드로 보이는 부분만 그림
+        self.tiles = None
+        self.static_texts = {}  # 라벨별 텍스트 배치 캐시
+        self.max_text_size = QSizeF(0, 0)  # 가장 큰 라벨 텍스트 크기 (박스 밖으로 나가는 텍스트의 갱신/컬링 여유)
+        self.vertex_sprites = {}  # (반지름, 화면 배율)별 꼭지점 원 이미지
+
     def load_pixmap(self, pixmap):
+        if pixmap.width() * pixmap.height() >= TILED_MIN_PIXELS:
+            self.load_image(pixmap.toImage())
+            return
         self.pixmap = pixmap
+        self.image_size = pixmap.size()
+        self.invalidate_pixmap_cache()
+        self.set_tiles(None)
+        self.shapes = []
+        self.update_image_offset()
+        self.update()
+
+    def load_image(self, image):
+        """QImage 로드, 아주 큰 이미지는 픽스맵으로 복사하지 않고 타일 피라미드가 원본 하나만 들고 있음"""
+        if image.width() * image.height() < TILED_MIN_PIXELS:
+            self.load_pixmap(QPixmap.fromImage(image))
+            return
+        self.pixmap = None
+        self.image_size = image.size()
+        self.invalidate_pixmap_cache()
+        self.set_tiles(image)
         self.shapes = []
         self.update_image_offset()
         self.update()
 
     def update_image_offset(self):
         """이미지의 오프셋을 계산하여 중앙에 맞게 설정"""
-        if self.pixmap:
-            scaled_pixmap_size = self.pixmap.size() * self.scale_factor
+        if self.image_size is not None:
+            scaled_pixmap_size = self.image_size * self.scale_factor
             self.image_offset = QPointF(
                 (self.width() - scaled_pixmap_size.width()) / 2,
                 (self.height() - scaled_pixmap_size.height()) / 2
             )
 
+    def set_tiles(self, image):
+        if self.tiles is not None:
+            self.tiles.cancel_pending()
+            self.tiles.deleteLater()
+            self.tiles = None
+        if image is not None:
+            self.tiles = TilePyramid(image, self)
+            self.tiles.updated.connect(self.update)
+
+    def invalidate_pixmap_cache(self):
+        self.scaled_pixmap = None
+        self.scaled_pixmap_key = None
+
+    def get_scaled_pixmap(self):
+        smooth = not self.interacting
+        key = (self.pixmap.cacheKey(), self.scale_factor, smooth)
+        if self.scaled_pixmap_key != key:
+            transform = Qt.SmoothTransformation if smooth else Qt.FastTransformation
+            self.scaled_pixmap = self.pixmap.scaled(
+                self.pixmap.size() * self.scale_factor, Qt.KeepAspectRatio, transform)
+            self.scaled_pixmap_key = key
+        return self.scaled_pixmap
+
+    def refine_pixmap(self):
+        # 조작이 멈추면 부드러운 스케일링으로 다시 그림
+        self.interacting = False
+        self.update()
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         painter.setRenderHint(QPainter.SmoothPixmapTransform)
 
-        if self.pixmap:
-            # 스케일링된 픽스맵을 화면에 그리기
-            scaled_pixmap = self.pixmap.scaled(
-                self.pixmap.size() * self.scale_factor, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            painter.drawPixmap(self.image_offset, scaled_pixmap)
-
-            pen = QPen(QColor(0, 255, 0), 2)
-            painter.setPen(pen)
-            painter.setBrush(Qt.NoBrush)
-
-            # 기존의 라벨링된 사각형을 그리기
-            for shape, label in self.shapes:
-                scaled_shape = [point * self.scale_factor + self.image_offset for point in shape]
-                if shape == self.hovered_shape:
-                    painter.setBrush(QColor(255, 0, 0, 25))
-                else:
-                    painter.setBrush(Qt.NoBrush)
-
-                painter.setPen(QPen(QColor(0, 255, 0), 2))
-                painter.drawRect(QRectF(scaled_shape[0], scaled_shape[1]))
-                self._draw_vertices(painter, scaled_shape)
+        if self.image_size is not None:
+            if self.tiles is not None:
+                # 보이는 영역의 타일만 그리기
+                self.tiles.draw(painter, self.image_offset, self.scale_factor, event.rect())
+            else:
+                # 캐시된 스케일링 픽스맵을 화면에 그리기
+                painter.drawPixmap(self.image_offset, self.get_scaled_pixmap())
 
-                painter.setPen(QPen(QColor(255, 255, 255)))
-                painter.drawText(QRectF(scaled_shape[0], scaled_shape[1]), Qt.AlignCenter, label)
+            # 기존의 라벨링된 사각형을 스타일별로 모아서 그리기
+            self._draw_shapes(painter, event.rect())
 
             # 현재 그리는 중인 사각형을 그리기
             if self.current_shape:
                 scaled_shape = [point * self.scale_factor + self.image_offset for point in self.current_shape]
-                pen.setColor(QColor(255, 0, 0))
-                painter.setPen(pen)
+                painter.setPen(QPen(QColor(255, 0, 0), 2))
                 painter.setBrush(Qt.NoBrush)
                 painter.drawRect(QRectF(scaled_shape[0], scaled_shape[1]))
                 self._draw_vertices(painter, scaled_shape)
 
-    def _draw_vertices(self, painter, shape):
+    def _draw_shapes(self, painter, exposed_rect):
+        if not self.shapes:
+            return
+        # 이미지 좌표 -> 화면 좌표 변환은 행렬 하나로 처리
+        transform = QTransform(self.scale_factor, 0, 0, self.scale_factor,
+                               self.image_offset.x(), self.image_offset.y())
+        # 작은 박스는 가운데 텍스트가 박스 밖으로 나가므로 텍스트 크기 절반만큼 더 넓게 확인
+        for label in {label for _, label in self.shapes} - self.static_texts.keys():
+            self._static_text(label, painter.font())
+        margin_x = max(self.vertex_radius * 2 + 2, self.max_text_size.width() / 2)
+        margin_y = max(self.vertex_radius * 2 + 2, self.max_text_size.height() / 2)
+        visible = QRectF(exposed_rect).adjusted(-margin_x, -margin_y, margin_x, margin_y)
+
+        rects = []
+        labels = []
+        hovered_rect = None
+        for shape, label in self.shapes:
+            rect = transform.mapRect(QRectF(shape[0], shape[1]))
+            if not visible.intersects(rect):
+                continue
+            rects.append(rect)
+            labels.append(label)
+            if shape is self.hovered_shape:
+                hovered_rect = rect
+
+        painter.setPen(QPen(QColor(0, 255, 0), 2))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRects(rects)
+        if hovered_rect is not None:
+            painter.setBrush(QColor(255, 0, 0, 25))
+            painter.drawRect(hovered_rect)
+
+        # 꼭지점 원은 미리 그린 스프라이트를 한 번의 호출로 찍음
+        # 스프라이트는 장치 픽셀 해상도로 그렸으므로 논리 크기로 줄여서 찍음
+        sprite = self._vertex_sprite(self.vertex_radius)
+        source = QRectF(sprite.rect())
+        scale = 1 / sprite.devicePixelRatio()
+        fragments = [QPainter.PixmapFragment.create(vertex, source, scale, scale)
+                     for rect in rects
+                     for vertex in (rect.topLeft(), rect.topRight(), rect.bottomRight(), rect.bottomLeft())]
+        painter.drawPixmapFragments(fragments, sprite)
+        if hovered_rect is not None and self.hovered_vertex is not None:
+            corners = (hovered_rect.topLeft(), hovered_rect.topRight(),
+                       hovered_rect.bottomRight(), hovered_rect.bottomLeft())
+            sprite = self._vertex_sprite(self.vertex_radius * 2)
+            scale = 1 / sprite.devicePixelRatio()
+            painter.drawPixmapFragments([QPainter.PixmapFragment.create(corners[self.hovered_vertex],
+                                                                        QRectF(sprite.rect()), scale, scale)], sprite)
+
+        # 라벨 텍스트는 클래스별로 배치 계산된 QStaticText 재사용
+        painter.setPen(QPen(QColor(255, 255, 255)))
+        for rect, label in zip(rects, labels):
+            text = self._static_text(label, painter.font())
+            size = text.size()
+            center = rect.center()
+            painter.drawStaticText(QPointF(center.x() - size.width() / 2, center.y() - size.height() / 2), text)
+
+    def _static_text(self, label, font):
+        text = self.static_texts.get(label)
+        if text is None:
+            text = QStaticText(label)
+            text.prepare(QTransform(), font)
+            self.static_texts[label] = text
+            size = text.size()
+            self.max_text_size = QSizeF(max(self.max_text_size.width(), size.width()),
+                                        max(self.max_text_size.height(), size.height()))
+        return text
+
+    def _vertex_sprite(self, radius):
+        # 고해상도 화면에서 흐려지지 않도록 장치 픽셀 크기로 그림 (창이 다른 배율의 화면으로 옮겨가면 새로 만듦)
+        ratio = self.devicePixelRatioF()
+        sprite = self.vertex_sprites.get((radius, ratio))
+        if sprite is None:
+            size = radius * 2 + 4  # 테두리 두께 여유
+            sprite = QPixmap(math.ceil(size * ratio), math.ceil(size * ratio))
+            sprite.setDevicePixelRatio(ratio)
+            sprite.fill(Qt.transparent)
+            painter = QPainter(sprite)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(QColor(0, 255, 0), 2))
+            painter.setBrush(QColor(255, 255, 255))
+            painter.drawEllipse(QPointF(size / 2, size / 2), radius, radius)
+            painter.end()
+            self.vertex_sprites[(radius, ratio)] = sprite
+        return sprite
+
+    def _draw_vertices(self, painter, shape, hovered_vertex=None):
         vertices = [
             shape[0],
             QPointF(shape[1].x(), shape[0].y()),
@@ -90,14 +235,14 @@ class Canvas(QFrame):
             QPointF(shape[0].x(), shape[1].y())
         ]
         for i, vertex in enumerate(vertices):
-            radius = self.vertex_radius * 2 if (self.hovered_shape and self.hovered_vertex == i) else self.vertex_radius
+            radius = self.vertex_radius * 2 if hovered_vertex == i else self.vertex_radius
             painter.setBrush(QColor(255, 255, 255))
             painter.drawEllipse(vertex, radius, radius)
 
     def mousePressEvent(self, event):
         try:
             self.setFocus()
-            if event.button() == Qt.LeftButton and self.pixmap:
+            if event.button() == Qt.LeftButton and self.image_size is not None:
                 self.selected_vertex = None
                 self.selected_shape = None
                 self.dragging_shape = None
@@ -105,32 +250,18 @@ class Canvas(QFrame):
                 click_pos = (event.pos() - self.image_offset) / self.scale_factor
 
                 # 기존 사각형의 꼭지점 또는 내부를 클릭했는지 확인
-                for shape, _ in self.shapes:
-                    vertices = [
-                        shape[0],
-                        QPointF(shape[1].x(), shape[0].y()),
-                        shape[1],
-                        QPointF(shape[0].x(), shape[1].y())
-                    ]
-                    for i, vertex in enumerate(vertices):
-                        if self._is_within_vertex(click_pos, vertex):
-                            self.selected_shape = shape
-                            self.selected_vertex = i
-                            break
-                    if self.selected_shape:
-                        break
+                self.selected_shape, self.selected_vertex = self.find_vertex(click_pos)
 
                 if self.selected_shape is None:
-                    for shape, _ in self.shapes:
-                        if QRectF(shape[0], shape[1]).contains(click_pos):
-                            self.selected_shape = shape
-                            self.offset = click_pos - shape[0]
-                            self.dragging_shape = shape
-                            break
+                    shape = self.find_shape(click_pos)
+                    if shape is not None:
+                        self.selected_shape = shape
+                        self.offset = click_pos - shape[0]
+                        self.dragging_shape = shape
 
                 # 새로운 사각형 그리기 시작
                 if self.selected_shape is None:
-                    if QRectF(QPointF(0, 0), QPointF(self.pixmap.size().width(), self.pixmap.size().height())).contains(click_pos):
+                    if QRectF(QPointF(0, 0), QPointF(self.image_size.width(), self.image_size.height())).contains(click_pos):
                         self.current_shape = [click_pos, click_pos]
                         self.drawing = True
 
@@ -146,9 +277,11 @@ class Canvas(QFrame):
     def mouseMoveEvent(self, event):
         try:
             if self.drawing and self.current_shape:
+                old_rect = self.shape_rect(self.current_shape)
                 self.current_shape[1] = (event.pos() - self.image_offset) / self.scale_factor
-                self.update()
+                self.update(old_rect.united(self.shape_rect(self.current_shape)))
             elif self.selected_vertex is not None and self.selected_shape:
+                old_rect = self.shape_rect(self.selected_shape)
                 click_pos = (event.pos() - self.image_offset) / self.scale_factor
                 if self.selected_vertex == 0:
                     self.selected_shape[0] = click_pos
@@ -160,14 +293,17 @@ class Canvas(QFrame):
                 elif self.selected_vertex == 3:
                     self.selected_shape[0].setX(click_pos.x())
                     self.selected_shape[1].setY(click_pos.y())
-                self.update()
+                self.shape_index.update(id(self.selected_shape), self.selected_shape)
+                self.update(old_rect.united(self.shape_rect(self.selected_shape)))
             elif self.dragging_shape:
+                old_rect = self.shape_rect(self.dragging_shape)
                 click_pos = (event.pos() - self.image_offset) / self.scale_factor
                 top_left = click_pos - self.offset
                 bottom_right = top_left + (self.dragging_shape[1] - self.dragging_shape[0])
                 self.dragging_shape[0] = top_left
                 self.dragging_shape[1] = bottom_right
-                self.update()
+                self.shape_index.update(id(self.dragging_shape), self.dragging_shape)
+                self.update(old_rect.united(self.shape_rect(self.dragging_shape)))
             elif self.panning and self.last_mouse_position is not None:
                 # 패닝 중일 때 화면을 이동
                 delta = event.pos() - self.last_mouse_position
@@ -175,48 +311,87 @@ class Canvas(QFrame):
                 self.last_mouse_position = event.pos()
                 self.update()
             else:
-                self.hovered_vertex = None
-                self.hovered_shape = None
+                old_hovered_shape = self.hovered_shape
+                old_hovered_vertex = self.hovered_vertex
                 click_pos = (event.pos() - self.image_offset) / self.scale_factor
-                for shape, _ in self.shapes:
-                    vertices = [
-                        shape[0],
-                        QPointF(shape[1].x(), shape[0].y()),
-                        shape[1],
-                        QPointF(shape[0].x(), shape[1].y())
-                    ]
-                    for i, vertex in enumerate(vertices):
-                        if self._is_within_vertex(click_pos, vertex):
-                            self.hovered_vertex = i
-                            self.hovered_shape = shape
-                            self.update()
-                            break
-                    if self.hovered_vertex is not None:
-                        break
+                self.hovered_shape, self.hovered_vertex = self.find_vertex(click_pos)
 
                 if self.hovered_shape is None:
-                    for shape, _ in self.shapes:
-                        if QRectF(shape[0], shape[1]).contains(click_pos):
-                            self.hovered_shape = shape
-                            break
+                    self.hovered_shape = self.find_shape(click_pos)
 
-                self.update()
+                # 호버 상태가 바뀐 경우에만 이전/현재 호버 사각형 영역을 다시 그림
+                if old_hovered_shape is not self.hovered_shape or old_hovered_vertex != self.hovered_vertex:
+                    self.update_shapes(old_hovered_shape, self.hovered_shape)
         except Exception as e:
             print(f"Error in mouseMoveEvent: {e}")
 
+    def sync_shape_index(self):
+        # 목록이 교체되었거나 줄었으면 전체 재구성, 뒤에 추가만 되었으면 추가분만 등록
+        if self.shapes is not self.indexed_shapes or len(self.shapes) < self.indexed_count:
+            self.shape_index.clear()
+            self.shape_order = {}
+            self.indexed_shapes = self.shapes
+            self.indexed_count = 0
+        for i in range(self.indexed_count, len(self.shapes)):
+            shape = self.shapes[i][0]
+            self.shape_index.insert(id(shape), shape)
+            self.shape_order[id(shape)] = (i, shape)
+        self.indexed_count = len(self.shapes)
+
+    def _candidates(self, pos):
+        self.sync_shape_index()
+        # 기존 선형 탐색과 같은 우선순위가 되도록 목록 순서대로 정렬
+        return [self.shape_order[key] for key in sorted(self.shape_index.query(pos),
+                                                        key=lambda key: self.shape_order[key][0])]
+
+    def find_vertex(self, pos):
+        for _, shape in self._candidates(pos):
+            vertices = [
+                shape[0],
+                QPointF(shape[1].x(), shape[0].y()),
+                shape[1],
+                QPointF(shape[0].x(), shape[1].y())
+            ]
+            for i, vertex in enumerate(vertices):
+                if self._is_within_vertex(pos, vertex):
+                    return shape, i
+        return None, None
+
+    def find_shape(self, pos):
+        for _, shape in self._candidates(pos):
+            if QRectF(shape[0], shape[1]).contains(pos):
+                return shape
+        return None
+
+    def shape_rect(self, shape):
+        """사각형이 화면에서 차지하는 영역 (꼭지점 원, 테두리, 가운데 라벨 텍스트 포함)"""
+        rect = QRectF(shape[0] * self.scale_factor + self.image_offset,
+                      shape[1] * self.scale_factor + self.image_offset).normalized()
+        margin = self.vertex_radius * 2 + 2
+        text_rect = QRectF(QPointF(0, 0), self.max_text_size)
+        text_rect.moveCenter(rect.center())
+        return rect.adjusted(-margin, -margin, margin, margin).united(text_rect).toAlignedRect()
+
+    def update_shapes(self, *shapes):
+        region = QRect()
+        for shape in shapes:
+            if shape is not None:
+                region = region.united(self.shape_rect(shape))
+        if not region.isNull():
+            self.update(region)
+
     def mouseReleaseEvent(self, event):
         try:
             if event.button() == Qt.LeftButton:
                 if self.drawing and self.current_shape:
                     self.current_shape[1] = (event.pos() - self.image_offset) / self.scale_factor
-                    dialog = LabelDialog(self.labels, self)
-                    if dialog.exec_():
-                        label_name = dialog.get_label()
-                        if label_name:  # 라벨이 선택된 경우에만 저장
-                            self.shapes.append((self.current_shape, label_name))
-                            self.labeling_done = True  # 라벨링 완료로 설정
-                        else:
-                            self.labeling_done = False  # 라벨이 없으면 False로 설정
+                    label_name = self.class_picker.pick()
+                    if label_name:  # 라벨이 선택된 경우에만 저장
+                        self.shapes.append((self.current_shape, label_name))
+                        self.labeling_done = True  # 라벨링 완료로 설정
+                    else:
+                        # 팝업을 닫아도 이미 그린 박스가 있으면 라벨링 상태 유지
+                        self.labeling_done = bool(self.shapes)
                     self.current_shape = None
                     self.drawing = False
                     if not self.labeling_done:  # 라벨이 선택되지 않으면 비디오 피드로 복귀
@@ -238,13 +413,12 @@ class Canvas(QFrame):
     def mouseDoubleClickEvent(self, event):
         try:
             if self.selected_shape:
-                dialog = LabelDialog(self.labels, self)
-                if dialog.exec_():
-                    label_name = dialog.get_label()
-                    for i, (shape, _) in enumerate(self.shapes):
-                        if shape == self.selected_shape:
+                for i, (shape, current_label) in enumerate(self.shapes):
+                    if shape == self.selected_shape:
+                        label_name = self.class_picker.pick(current_label)
+                        if label_name:
                             self.shapes[i] = (shape, label_name)
-                            break
+                        break
                 self.update()
         except Exception as e:
             print(f"Error in mouseDoubleClickEvent: {e}")
@@ -255,7 +429,7 @@ class Canvas(QFrame):
                 self.shapes = [s for s in self.shapes if s[0] != self.selected_shape]
                 self.selected_shape = None
                 self.update()
-            elif event.key() == Qt.Key_Return and self.pixmap:  # Enter 키로 캡처 기능 대체
+            elif event.key() == Qt.Key_Return and self.image_size is not None:  # Enter 키로 캡처 기능 대체
                 self.parent().parent().capture_still()  # 캡처 기능 호출
         except Exception as e:
             print(f"Error in keyPressEvent: {e}")
@@ -267,6 +441,8 @@ class Canvas(QFrame):
                 delta = event.angleDelta().y() / 120
                 self.scale_factor += delta * 0.1
                 self.scale_factor = max(0.1, min(self.scale_factor, 5.0))
+                self.interacting = True
+                self.refine_timer.start()
 
                 # 마우스 위치를 캔버스 내의 이미지 좌표로 변환
                 mouse_pos = event.pos()
@@ -288,3 +464,23 @@ class Canvas(QFrame):
 
     def get_shapes(self):
         return self.shapes
+
+    def add_shape(self, shape, label):
+        self.shapes.append((shape, label))
+
+    def clear_shapes(self):
+        self.shapes = []
+
+    def rename_labels(self, renames):
+        """클래스 이름 변경/병합/삭제를 화면의 박스에 반영 (새 이름이 None 이면 박스 삭제)"""
+        shapes = []
+        for shape, label in self.shapes:
+            label = renames.get(label, label)
+            if label is not None:
+                shapes.append((shape, label))
+        if len(shapes) != len(self.shapes):
+            self.selected_shape = None
+            self.hovered_shape = None
+            self.dragging_shape = None
+        self.shapes = shapes
+        self.update()
@@ -0,0 +1,167 @@
+from PyQt5.QtCore import Qt, QStringListModel
+from PyQt5.QtGui import QCursor
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QListView, QPushButton, QApplication, \
+    QAbstractItemView
+
+from labelbox import LabelDialog
+
+
+MAX_RECENT = 10  # 검색어가 없을 때 맨 위에 보여줄 최근 사용 클래스 수
+
+
+def fuzzy_score(query, name):
+    """query 글자가 name 에 순서대로 모두 있으면 점수 (작을수록 잘 맞음), 없으면 None"""
+    if name.startswith(query):
+        return 0
+    position = name.find(query)
+    if position >= 0:
+        return 1 + position / 1000
+    # 연속되지 않아도 순서대로 있으면 매칭, 글자 사이 간격이 작을수록 우선
+    gaps = 0
+    start = 0
+    for char in query:
+        found = name.find(char, start)
+        if found < 0:
+            return None
+        gaps += found - start
+        start = found + 1
+    return 2 + gaps / 1000
+
+
+class ClassPicker(QDialog):
+    """한 번 만들어두고 재사용하는 클래스 선택 팝업 (검색, 키보드 이동, 최근 사용 순서)"""
+
+    def __init__(self, labels, parent=None):
+        super(ClassPicker, self).__init__(parent, Qt.Popup)
+        self.labels = labels  # 캔버스와 공유하는 목록 (LabelDialog 에서 내용이 바뀔 수 있음)
+        self.names = ()
+        self.lower_names = []
+        self.recent = []
+        self.matches = []
+        self.selected_label = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        self.search_input = QLineEdit(self)
+        self.search_input.setPlaceholderText("Search classes")
+        self.search_input.textChanged.connect(self.update_matches)
+        layout.addWidget(self.search_input)
+
+        # 항목 높이가 모두 같다고 알려주면 클래스가 많아도 목록 갱신 비용이 거의 없음
+        self.model = QStringListModel(self)
+        self.list_view = QListView(self)
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setFocusPolicy(Qt.NoFocus)  # 입력 포커스는 항상 검색창에
+        self.list_view.clicked.connect(lambda index: self.choose(index.row()))
+        layout.addWidget(self.list_view)
+
+        button_layout = QHBoxLayout()
+        self.manage_button = QPushButton("Manage Labels...", self)
+        self.manage_button.setAutoDefault(False)
+        self.manage_button.clicked.connect(self.manage_labels)
+        button_layout.addStretch()
+        button_layout.addWidget(self.manage_button)
+        layout.addLayout(button_layout)
+
+        self.resize(280, 360)
+
+    def sync_labels(self):
+        # 라벨 목록이 바뀐 경우에만 검색용 소문자 목록을 다시 만듦
+        if tuple(self.labels) == self.names:
+            return
+        self.names = tuple(self.labels)
+        self.lower_names = [name.lower() for name in self.names]
+        self.recent = [name for name in self.recent if name in self.names]
+
+    def update_matches(self, text=None):
+        query = self.search_input.text().strip().lower()
+        recent_rank = {name: i for i, name in enumerate(self.recent)}
+        if not query:
+            others = [name for name in self.names if name not in recent_rank]
+            self.matches = self.recent + others
+        else:
+            scored = []
+            for i, lower_name in enumerate(self.lower_names):
+                score = fuzzy_score(query, lower_name)
+                if score is not None:
+                    name = self.names[i]
+                    scored.append((score, recent_rank.get(name, MAX_RECENT), i, name))
+            scored.sort()
+            self.matches = [name for _, _, _, name in scored]
+        self.model.setStringList(self.matches)
+        if self.matches:
+            self.list_view.setCurrentIndex(self.model.index(0))
+
+    def move_selection(self, step):
+        if not self.matches:
+            return
+        row = self.list_view.currentIndex().row()
+        row = min(max(row + step, 0), len(self.matches) - 1)
+        index = self.model.index(row)
+        self.list_view.setCurrentIndex(index)
+        self.list_view.scrollTo(index)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        page = max(self.list_view.height() // max(self.list_view.sizeHintForRow(0), 1), 1)
+        if key == Qt.Key_Down:
+            self.move_selection(1)
+        elif key == Qt.Key_Up:
+            self.move_selection(-1)
+        elif key == Qt.Key_PageDown:
+            self.move_selection(page)
+        elif key == Qt.Key_PageUp:
+            self.move_selection(-page)
+        elif key in (Qt.Key_Return, Qt.Key_Enter):
+            self.choose(self.list_view.currentIndex().row())
+        else:
+            super(ClassPicker, self).keyPressEvent(event)
+
+    def choose(self, row):
+        if 0 <= row < len(self.matches):
+            self.selected_label = self.matches[row]
+            self.accept()
+
+    def manage_labels(self):
+        # 클래스 추가/삭제는 기존 관리 다이얼로그에서 처리
+        dialog = LabelDialog(self.labels, self.parent())
+        label_name = dialog.get_label() if dialog.exec_() else None
+        self.sync_labels()
+        if label_name:
+            self.selected_label = label_name
+            self.accept()
+        else:
+            self.update_matches()
+
+    def remember(self, label_name):
+        if label_name in self.recent:
+            self.recent.remove(label_name)
+        self.recent.insert(0, label_name)
+        del self.recent[MAX_RECENT:]
+
+    def pick(self, current_label=None):
+        """커서 위치에 팝업을 띄우고 선택된 클래스 이름 반환 (취소 시 None)"""
+        self.sync_labels()
+        self.selected_label = None
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self.update_matches()
+        if current_label in self.matches:
+            self.list_view.setCurrentIndex(self.model.index(self.matches.index(current_label)))
+
+        # 화면 밖으로 나가지 않도록 위치 조정
+        position = QCursor.pos()
+        screen = QApplication.desktop().availableGeometry(position)
+        x = min(max(position.x(), screen.left()), screen.right() - self.width())
+        y = min(max(position.y(), screen.top()), screen.bottom() - self.height())
+        self.move(x, y)
+        self.search_input.setFocus()
+
+        if self.exec_() and self.selected_label:
+            self.remember(self.selected_label)
+            return self.selected_label
+        return None
@@ -0,0 +1,244 @@
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import label_codec
+from dataset_split import DatasetSplitter, SPLIT_NAMES, read_dataset_paths, write_dataset_yaml
+from importers import load_classes, save_classes, TASK_SIZE
+
+
+JOURNAL_SUFFIX = '.remap.json'
+REMAPPED_SUFFIX = '.remap.tmp'  # 변환이 끝난 라벨 파일 (아직 원본을 교체하지 않음)
+DATASETS_SUFFIX = '.datasets.json'  # 이 classes.txt 의 id 로 라벨을 저장한 데이터셋 폴더 목록
+_datasets_lock = threading.Lock()
+
+
+def remap_label_file(label_path, mapping):
+    """class id 를 mapping 으로 바꾼 결과를 임시 파일로 기록 (원본은 그대로 둠)"""
+    remapped_path = label_path + REMAPPED_SUFFIX
+    if os.path.exists(remapped_path):
+        return False  # 이전 실행에서 이미 변환됨
+    # 형식이 잘못된 줄을 건너뛰면 그대로 삭제되므로 변환을 중단
+    try:
+        class_ids, boxes = label_codec.read(label_path, strict=True)
+    except ValueError as e:
+        raise ValueError(f"{label_path}: {e}")
+    # mapping 범위 밖의 id 는 원래부터 잘못된 값이므로 그대로 유지
+    in_range = (class_ids >= 0) & (class_ids < len(mapping))
+    new_ids = class_ids.copy()
+    new_ids[in_range] = mapping[class_ids[in_range]]
+    keep = new_ids >= 0
+    part_path = remapped_path + '.part'
+    label_codec.write(part_path, new_ids[keep], boxes[keep])
+    os.replace(part_path, remapped_path)
+    return True
+
+
+def _remap_chunk(tasks):
+    mapping, label_paths = tasks
+    return sum(remap_label_file(label_path, mapping) for label_path in label_paths)
+
+
+def _discard_chunk(label_paths):
+    for label_path in label_paths:
+        for path in (label_path + REMAPPED_SUFFIX, label_path + REMAPPED_SUFFIX + '.part'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _commit_chunk(label_paths):
+    committed = 0
+    for label_path in label_paths:
+        remapped_path = label_path + REMAPPED_SUFFIX
+        if os.path.exists(remapped_path):
+            os.replace(remapped_path, label_path)
+            committed += 1
+    return committed
+
+
+class ClassRegistry:
+    """classes.txt 의 클래스 목록을 관리하고 id 가 바뀌는 변경은 라벨 파일까지 함께 변환"""
+
+    def __init__(self, classes_path="classes.txt", workers=None):
+        self.classes_path = classes_path
+        self.journal_path = classes_path + JOURNAL_SUFFIX
+        self.datasets_path = classes_path + DATASETS_SUFFIX
+        self.workers = workers
+        self.names = load_classes(classes_path)
+
+    def class_id(self, name):
+        if name not in self.names:
+            raise ValueError(f"Unknown class: {name}")
+        return self.names.index(name)
+
+    def reload(self):
+        # 앞서 큐에 들어간 변경이 classes.txt 를 바꿨을 수 있으므로 작업 시작 시 다시 읽음
+        self.names = load_classes(self.classes_path)
+
+    def _load_datasets(self):
+        if not os.path.exists(self.datasets_path):
+            return []
+        with open(self.datasets_path, 'r') as f:
+            return json.load(f)
+
+    def register_dataset(self, dataset_folder):
+        """이 클래스 목록으로 라벨을 저장하는 폴더를 기록 (id 가 바뀌는 변경 시 함께 변환)"""
+        folder = os.path.abspath(dataset_folder)
+        with _datasets_lock:
+            folders = self._load_datasets()
+            if folder in folders:
+                return
+            folders.append(folder)
+            tmp_path = self.datasets_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(folders, f, indent=1)
+            os.replace(tmp_path, self.datasets_path)
+
+    def dataset_folders(self):
+        """기록된 데이터셋 폴더 중 아직 있는 폴더"""
+        with _datasets_lock:
+            return [folder for folder in self._load_datasets() if os.path.isdir(folder)]
+
+    def _check_idle(self):
+        if self.has_pending():
+            raise RuntimeError("A class change is still being applied to the label files")
+
+    def add(self, name):
+        self._check_idle()
+        self.reload()
+        if name in self.names:
+            raise ValueError(f"Class already exists: {name}")
+        # 뒤에 추가하면 기존 id 는 그대로
+        save_classes(self.classes_path, self.names + [name])
+        self.names.append(name)
+
+    def rename(self, old_name, new_name):
+        self._check_idle()
+        self.reload()
+        if new_name in self.names:
+            raise ValueError(f"Class already exists: {new_name}")
+        names = list(self.names)
+        names[self.class_id(old_name)] = new_name
+        save_classes(self.classes_path, names)
+        self.names = names
+
+    def delete(self, name, dataset_folders, progress_callback=None):
+        """클래스와 해당 박스를 삭제, 뒤쪽 id 는 한 칸씩 당겨서 라벨 파일에 반영"""
+        self.reload()
+        removed = self.class_id(name)
+        names = [n for n in self.names if n != name]
+        mapping = np.array([-1 if i == removed else (i if i < removed else i - 1)
+                            for i in range(len(self.names))], dtype=np.int64)
+        return self._apply(names, mapping, dataset_folders, progress_callback)
+
+    def merge(self, source_name, target_name, dataset_folders, progress_callback=None):
+        """source 박스를 target 으로 합치고 source 클래스 삭제"""
+        self.reload()
+        source = self.class_id(source_name)
+        target = self.class_id(target_name)
+        if source == target:
+            raise ValueError("Cannot merge a class into itself")
+        names = [n for n in self.names if n != source_name]
+        mapping = np.array([names.index(target_name) if i == source else names.index(self.names[i])
+                            for i in range(len(self.names))], dtype=np.int64)
+        return self._apply(names, mapping, dataset_folders, progress_callback)
+
+    def reorder(self, new_order, dataset_folders, progress_callback=None):
+        self.reload()
+        if sorted(new_order) != sorted(self.names):
+            raise ValueError("New order must contain exactly the existing classes")
+        mapping = np.array([new_order.index(name) for name in self.names], dtype=np.int64)
+        return self._apply(list(new_order), mapping, dataset_folders, progress_callback)
+
+    def _apply(self, names, mapping, dataset_folders, progress_callback=None):
+        if self.has_pending():
+            raise RuntimeError("A previous class change is not finished; call resume() first")
+        # 변경 내용을 먼저 기록해두면 중간에 종료되어도 resume 으로 이어서 처리 가능
+        journal = {'names': names, 'mapping': mapping.tolist(),
+                   'folders': list(dict.fromkeys(os.path.abspath(folder) for folder in dataset_folders)),
+                   'state': 'remapping'}
+        self._write_journal(journal)
+        return self._run(journal, progress_callback)
+
+    def has_pending(self):
+        return os.path.exists(self.journal_path)
+
+    def resume(self, progress_callback=None):
+        """중단된 변경이 있으면 이어서 처리"""
+        if not self.has_pending():
+            return 0
+        with open(self.journal_path, 'r') as f:
+            journal = json.load(f)
+        return self._run(journal, progress_callback)
+
+    def _write_journal(self, journal):
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(journal, f)
+        os.replace(tmp_path, self.journal_path)
+
+    def _label_paths(self, folders):
+        for folder in folders:
+            label_folder = os.path.join(folder, 'labels')
+            if os.path.isdir(label_folder):
+                with os.scandir(label_folder) as it:
+                    for e in it:
+                        if e.name.endswith('.txt') and e.is_file():
+                            yield e.path
+            # 분할 폴더의 라벨은 대부분 labels/ 의 하드링크라서 커밋 후 다시 연결하고,
+            # 원본이 없는 파일만 직접 변환 (심볼릭 링크는 원본을 따라가므로 제외)
+            for name in SPLIT_NAMES:
+                split_label_folder = os.path.join(folder, 'splits', name, 'labels')
+                if not os.path.isdir(split_label_folder):
+                    continue
+                with os.scandir(split_label_folder) as it:
+                    for e in it:
+                        if (e.name.endswith('.txt') and e.is_file(follow_symlinks=False) and
+                                not os.path.exists(os.path.join(label_folder, e.name))):
+                            yield e.path
+
+    def _update_dataset(self, folder, names):
+        # 분할 폴더의 하드링크와 dataset.yaml 의 nc/names 를 새 클래스 목록에 맞춤
+        DatasetSplitter(folder).relink_labels()
+        if os.path.exists(os.path.join(folder, "dataset.yaml")):
+            split_paths = read_dataset_paths(folder)
+            write_dataset_yaml(folder, names,
+                               train=split_paths.get('train', './images'),
+                               val=split_paths.get('val', './images'),
+                               test=split_paths.get('test'))
+
+    def _run(self, journal, progress_callback=None):
+        mapping = np.array(journal['mapping'], dtype=np.int64)
+        label_paths = sorted(self._label_paths(journal['folders']))
+        chunks = [label_paths[i:i + TASK_SIZE] for i in range(0, len(label_paths), TASK_SIZE)]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # 1단계: 모든 파일을 임시 파일로 변환 (원본은 그대로라서 몇 번을 다시 실행해도 결과가 같음)
+            if journal['state'] == 'remapping':
+                try:
+                    for done, _ in enumerate(executor.map(_remap_chunk, [(mapping, chunk) for chunk in chunks]),
+                                             start=1):
+                        if progress_callback:
+                            progress_callback(done, len(chunks))
+                except BaseException:
+                    # 취소 또는 오류 시 원본은 그대로이므로 임시 파일과 기록을 지우고 변경 전 상태로 되돌림
+                    for chunk in chunks:
+                        _discard_chunk(chunk)
+                    os.remove(self.journal_path)
+                    raise
+                journal['state'] = 'committing'
+                self._write_journal(journal)
+
+            # 2단계: 임시 파일로 원본 교체 (이미 교체된 파일은 임시 파일이 없으므로 건너뜀)
+            # 여기서부터는 되돌릴 수 없으므로 진행률 콜백(취소 요청)을 부르지 않음
+            committed = sum(executor.map(_commit_chunk, chunks))
+
+        for folder in journal['folders']:
+            self._update_dataset(folder, journal['names'])
+        save_classes(self.classes_path, journal['names'])
+        self.names = list(journal['names'])
+        os.remove(self.journal_path)
+        return committed
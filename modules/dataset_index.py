@@ -0,0 +1,292 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+LABEL_EXTENSIONS = ('.txt',)
+
+# inotify 이벤트 플래그 (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+NETWORK_FILESYSTEMS = ('nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', '9p', 'afs', 'ceph', 'glusterfs')
+MAX_SHARED_INDEXES = 4  # for_folder 로 동시에 감시하는 폴더 수 (넘으면 오래 안 쓴 인덱스 감시 중지)
+
+
+def _load_inotify():
+    if not hasattr(os, 'uname') or os.uname().sysname != 'Linux':
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, 'inotify_init1') or not hasattr(libc, 'inotify_add_watch'):
+        return None
+    return libc
+
+
+def _is_network_folder(folder):
+    """네트워크 파일 시스템 위의 폴더인지 (다른 PC 에서 쓴 파일은 inotify 로 알 수 없음)"""
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    path = os.path.realpath(folder)
+    best, best_type = '', None
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best):
+            best, best_type = mount_point, fs_type
+    return best_type in NETWORK_FILESYSTEMS
+
+
+def _scan_folder(folder, extensions):
+    """이름 -> (수정 시각, 크기)"""
+    entries = {}
+    if os.path.isdir(folder):
+        with os.scandir(folder) as it:
+            for e in it:
+                if e.name.lower().endswith(extensions) and e.is_file():
+                    st = e.stat()
+                    entries[e.name] = (st.st_mtime_ns, st.st_size)
+    return entries
+
+
+class DatasetIndex:
+    """images/labels 폴더를 한 번 스캔하고 inotify (없으면 주기적 스캔) 로 최신 상태를 유지하는 공유 인덱스"""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, dataset_folder, poll_interval=2.0, watch=True):
+        self.dataset_folder = dataset_folder
+        self.folders = {
+            'images': (os.path.join(dataset_folder, 'images'), IMAGE_EXTENSIONS),
+            'labels': (os.path.join(dataset_folder, 'labels'), LABEL_EXTENSIONS),
+        }
+        self.poll_interval = poll_interval
+        self.lock = threading.RLock()
+        self.entries = {kind: {} for kind in self.folders}
+        self.stems = {}  # 확장자를 뺀 이름 -> 이미지/라벨 파일 수 (이름 중복 확인용)
+        self.listeners = []
+        self.stopped = threading.Event()
+        self.thread = None
+        self.mode = None  # 'inotify' 또는 'poll'
+        self.rescan()
+        if watch:
+            self.start()
+
+    @classmethod
+    def for_folder(cls, dataset_folder):
+        """같은 폴더는 프로세스 안에서 인덱스 하나를 공유"""
+        key = os.path.abspath(dataset_folder)
+        with cls._instances_lock:
+            index = cls._instances.pop(key, None)
+            if index is None:
+                index = cls(dataset_folder)
+            cls._instances[key] = index  # 최근 사용 순서로 유지
+
+            # 주기적 스캔 모드에서는 인덱스마다 폴더 전체를 계속 다시 읽으므로 오래 안 쓴 인덱스는 감시 중지
+            # 리스너가 있는 인덱스는 계속 쓰이는 중이라 그대로 둠
+            idle = [k for k, other in cls._instances.items() if not other.listeners and other is not index]
+            evicted = [cls._instances.pop(k) for k in idle[:max(len(cls._instances) - MAX_SHARED_INDEXES, 0)]]
+        for other in evicted:
+            other.stop()
+        return index
+
+    @classmethod
+    def stop_all(cls):
+        with cls._instances_lock:
+            indexes = list(cls._instances.values())
+            cls._instances.clear()
+        for index in indexes:
+            index.stop()
+
+    def add_listener(self, callback):
+        """callback(kind, added, removed) 는 감시 스레드에서 호출됨"""
+        with self.lock:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def _notify(self, kind, added, removed):
+        if not added and not removed:
+            return
+        for callback in list(self.listeners):
+            try:
+                callback(kind, added, removed)
+            except Exception as e:
+                print(f"Error in dataset index listener: {e}")
+
+    def rescan(self):
+        for kind, (folder, extensions) in self.folders.items():
+            entries = _scan_folder(folder, extensions)
+            with self.lock:
+                old = self.entries[kind]
+                self.entries[kind] = entries
+                for name in old:
+                    self._remove_stem(name)
+                for name in entries:
+                    self._add_stem(name)
+            added = {name for name, stamp in entries.items() if old.get(name) != stamp}
+            self._notify(kind, added, set(old) - set(entries))
+
+    def record(self, path):
+        """직접 저장한 파일을 감시 이벤트를 기다리지 않고 바로 반영"""
+        folder, name = os.path.split(path)
+        for kind, (kind_folder, extensions) in self.folders.items():
+            if os.path.abspath(folder) == os.path.abspath(kind_folder) and name.lower().endswith(extensions):
+                self._update_entry(kind, name)
+
+    def _update_entry(self, kind, name):
+        path = os.path.join(self.folders[kind][0], name)
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        with self.lock:
+            old = self.entries[kind].get(name)
+            if stamp is None:
+                self.entries[kind].pop(name, None)
+            else:
+                self.entries[kind][name] = stamp
+            if old is None and stamp is not None:
+                self._add_stem(name)
+            elif old is not None and stamp is None:
+                self._remove_stem(name)
+        if stamp is None and old is not None:
+            self._notify(kind, set(), {name})
+        elif stamp is not None and stamp != old:
+            self._notify(kind, {name}, set())
+
+    def _add_stem(self, name):
+        stem = os.path.splitext(name)[0]
+        self.stems[stem] = self.stems.get(stem, 0) + 1
+
+    def _remove_stem(self, name):
+        stem = os.path.splitext(name)[0]
+        count = self.stems.get(stem, 0) - 1
+        if count > 0:
+            self.stems[stem] = count
+        else:
+            self.stems.pop(stem, None)
+
+    # 조회
+
+    def names(self, kind='images', extensions=None):
+        with self.lock:
+            names = list(self.entries[kind])
+        if extensions is not None:
+            names = [name for name in names if name.lower().endswith(extensions)]
+        return sorted(names)
+
+    def stamp(self, kind, name):
+        with self.lock:
+            return self.entries[kind].get(name)
+
+    def has_stem(self, stem):
+        """이미지나 라벨 중 같은 이름(확장자 제외)이 있는지"""
+        with self.lock:
+            return stem in self.stems
+
+    def pairs(self, extensions=IMAGE_EXTENSIONS):
+        """(이미지 경로, 라벨 경로) 목록, 라벨이 있는 이미지만 이름순으로"""
+        image_folder = self.folders['images'][0]
+        label_folder = self.folders['labels'][0]
+        with self.lock:
+            labels = self.entries['labels']
+            return [(os.path.join(image_folder, name), os.path.join(label_folder, os.path.splitext(name)[0] + '.txt'))
+                    for name in sorted(self.entries['images'])
+                    if name.lower().endswith(extensions) and os.path.splitext(name)[0] + '.txt' in labels]
+
+    # 감시
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._watch, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _watch(self):
+        # 공유 폴더는 다른 작업자가 저장한 파일을 놓치지 않도록 항상 주기적 스캔
+        libc = None if _is_network_folder(self.dataset_folder) else _load_inotify()
+        if libc is not None and self._watch_inotify(libc):
+            return
+        self._watch_poll()
+
+    def _watch_poll(self):
+        self.mode = 'poll'
+        while not self.stopped.wait(self.poll_interval):
+            self.rescan()
+
+    def _watch_inotify(self, libc):
+        """정상 종료면 True, 주기적 스캔으로 바꿔야 하면 False"""
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            watches = {}
+            for kind, (folder, _) in self.folders.items():
+                wd = libc.inotify_add_watch(fd, os.fsencode(folder), WATCH_MASK)
+                if wd < 0:
+                    # 폴더가 아직 없거나 감시 한도 초과
+                    return False
+                watches[wd] = kind
+            self.mode = 'inotify'
+            self.rescan()  # 감시 등록 전 사이에 바뀐 파일 반영
+
+            while not self.stopped.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                changed = set()
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                    name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+                    offset += EVENT_HEADER.size + length
+                    if mask & (IN_Q_OVERFLOW | IN_DELETE_SELF):
+                        changed = None  # 이벤트 유실, 전체 다시 스캔
+                        break
+                    kind = watches.get(wd)
+                    if kind is not None and name:
+                        name = os.fsdecode(name)
+                        if name.lower().endswith(self.folders[kind][1]):
+                            changed.add((kind, name))
+                if changed is None:
+                    self.rescan()
+                    if any(not os.path.isdir(folder) for folder, _ in self.folders.values()):
+                        return False
+                    continue
+                for kind, name in changed:
+                    self._update_entry(kind, name)
+            return True
+        finally:
+            os.close(fd)
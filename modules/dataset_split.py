@@ -0,0 +1,182 @@
+import os
+import random
+import shutil
+from collections import defaultdict
+
+import label_codec
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+SPLIT_NAMES = ('train', 'val', 'test')
+
+
+def write_dataset_yaml(dataset_folder, labels, train='./images', val='./images', test=None):
+    yaml_path = os.path.join(dataset_folder, "dataset.yaml")
+    lines = [f"train: {train}", f"val: {val}"]
+    if test:
+        lines.append(f"test: {test}")
+    yaml_content = "\n".join(lines) + f"\n\nnc: {len(labels)}\nnames: {labels}\n"
+    with open(yaml_path, 'w') as f:
+        f.write(yaml_content)
+    return yaml_path
+
+
+def read_dataset_paths(dataset_folder):
+    """기존 dataset.yaml 의 train/val/test 경로를 읽어옴 (없으면 빈 dict)"""
+    yaml_path = os.path.join(dataset_folder, "dataset.yaml")
+    paths = {}
+    if os.path.exists(yaml_path):
+        with open(yaml_path, 'r') as f:
+            for line in f:
+                key, sep, value = line.strip().partition(':')
+                if sep and key in SPLIT_NAMES and value.strip():
+                    paths[key] = value.strip()
+    return paths
+
+
+class DatasetSplitter:
+    def __init__(self, dataset_folder, ratios=(0.8, 0.1, 0.1), seed=0, link_mode='hardlink'):
+        if len(ratios) != len(SPLIT_NAMES) or any(r < 0 for r in ratios) or sum(ratios) <= 0:
+            raise ValueError(f"Invalid split ratios: {ratios}")
+        if link_mode not in ('hardlink', 'symlink'):
+            raise ValueError(f"Unknown link mode: {link_mode}")
+
+        self.dataset_folder = dataset_folder
+        self.image_folder = os.path.join(dataset_folder, 'images')
+        self.label_folder = os.path.join(dataset_folder, 'labels')
+        self.split_folder = os.path.join(dataset_folder, 'splits')
+        total = float(sum(ratios))
+        self.ratios = [r / total for r in ratios]
+        self.seed = seed
+        self.link_mode = link_mode
+
+    def collect(self):
+        # scandir 한 번으로 이미지/라벨 목록 수집 (정렬해서 시드 재현성 보장)
+        with os.scandir(self.image_folder) as it:
+            images = sorted(e.name for e in it if e.is_file() and e.name.lower().endswith(IMAGE_EXTENSIONS))
+
+        samples = []
+        for img_name in images:
+            label_name = os.path.splitext(img_name)[0] + '.txt'
+            label_path = os.path.join(self.label_folder, label_name)
+            classes = set()
+            try:
+                classes = set(label_codec.read(label_path)[0].tolist())
+            except FileNotFoundError:
+                label_name = None
+            samples.append((img_name, label_name, classes))
+        return samples
+
+    def assign(self, samples):
+        # 클래스 빈도 계산 후 각 이미지를 가장 희귀한 클래스 그룹에 배정 (층화 기준)
+        class_counts = defaultdict(int)
+        for _, _, classes in samples:
+            for class_id in classes:
+                class_counts[class_id] += 1
+
+        groups = defaultdict(list)
+        for sample in samples:
+            classes = sample[2]
+            key = min(classes, key=lambda c: (class_counts[c], c)) if classes else -1
+            groups[key].append(sample)
+
+        rng = random.Random(self.seed)
+        splits = {name: [] for name in SPLIT_NAMES}
+        for key in sorted(groups):
+            group = groups[key]
+            rng.shuffle(group)
+            for name, (start, end) in zip(SPLIT_NAMES, self._split_bounds(len(group))):
+                splits[name].extend(group[start:end])
+        return splits
+
+    def _split_bounds(self, count):
+        # 누적 비율 반올림으로 그룹마다 train/val/test 경계 계산
+        bounds = []
+        start = 0
+        cumulative = 0.0
+        for ratio in self.ratios:
+            cumulative += ratio
+            end = int(round(cumulative * count))
+            bounds.append((start, end))
+            start = end
+        return bounds
+
+    def materialize(self, splits):
+        if os.path.isdir(self.split_folder):
+            shutil.rmtree(self.split_folder)
+
+        for name, samples in splits.items():
+            if not samples:
+                continue
+            split_image_folder = os.path.join(self.split_folder, name, 'images')
+            split_label_folder = os.path.join(self.split_folder, name, 'labels')
+            os.makedirs(split_image_folder, exist_ok=True)
+            os.makedirs(split_label_folder, exist_ok=True)
+
+            for img_name, label_name, _ in samples:
+                self._link(os.path.join(self.image_folder, img_name), os.path.join(split_image_folder, img_name))
+                if label_name:
+                    self._link(os.path.join(self.label_folder, label_name),
+                               os.path.join(split_label_folder, label_name))
+
+    def _link(self, src, dst):
+        # 복사 대신 하드링크, 다른 파일시스템이면 심볼릭 링크로 대체
+        if self.link_mode == 'hardlink':
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                self.link_mode = 'symlink'
+        os.symlink(os.path.abspath(src), dst)
+
+    def add_sample(self, img_name, label_name, split='train'):
+        """분할 후 새로 저장된 샘플을 기존 분할에 연결 (다시 분할하기 전까지 학습에서 빠지지 않게)"""
+        for src_folder, name, kind in ((self.image_folder, img_name, 'images'),
+                                       (self.label_folder, label_name, 'labels')):
+            dst_folder = os.path.join(self.split_folder, split, kind)
+            os.makedirs(dst_folder, exist_ok=True)
+            dst = os.path.join(dst_folder, name)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            self._link(os.path.join(src_folder, name), dst)
+
+    def relink_labels(self):
+        """라벨 파일을 임시 파일 교체 방식으로 수정하면 하드링크가 예전 파일에 남으므로 다시 연결"""
+        relinked = 0
+        if not os.path.isdir(self.split_folder):
+            return relinked
+        for name in SPLIT_NAMES:
+            split_label_folder = os.path.join(self.split_folder, name, 'labels')
+            if not os.path.isdir(split_label_folder):
+                continue
+            with os.scandir(split_label_folder) as it:
+                for e in it:
+                    src = os.path.join(self.label_folder, e.name)
+                    # 심볼릭 링크는 경로를 따라가므로 그대로 둠
+                    if e.is_symlink() or not os.path.exists(src) or os.path.samefile(src, e.path):
+                        continue
+                    tmp_path = e.path + '.tmp'
+                    if os.path.lexists(tmp_path):
+                        os.remove(tmp_path)
+                    self._link(src, tmp_path)
+                    os.replace(tmp_path, e.path)
+                    relinked += 1
+        return relinked
+
+    def split(self, labels, progress_callback=None):
+        samples = self.collect()
+        if progress_callback:
+            progress_callback(1, 3)
+        splits = self.assign(samples)
+        if progress_callback:
+            progress_callback(2, 3)
+        self.materialize(splits)
+        if progress_callback:
+            progress_callback(3, 3)
+
+        paths = {name: f"./splits/{name}/images" if splits[name] else None for name in SPLIT_NAMES}
+        write_dataset_yaml(self.dataset_folder, labels,
+                           train=paths['train'] or './images',
+                           val=paths['val'] or paths['train'] or './images',
+                           test=paths['test'])
+        return {name: len(samples) for name, samples in splits.items()}
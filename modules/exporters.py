@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+import label_codec
+from importers import load_classes, TASK_SIZE
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def read_image_size(image_path):
+    # PIL 의 Image.open 은 헤더만 읽고 픽셀 디코딩은 하지 않음
+    with Image.open(image_path) as img:
+        return img.size
+
+
+def _parse_chunk(tasks):
+    results = []
+    for image_path, label_path in tasks:
+        try:
+            img_w, img_h = read_image_size(image_path)
+        except OSError:
+            results.append(None)
+            continue
+
+        boxes = []
+        if os.path.exists(label_path):
+            class_ids, yolo_boxes = label_codec.read(label_path)
+            # 정규화 좌표 -> 픽셀 좌표 (x_min, y_min, w, h) 를 한 번에 계산
+            sizes = yolo_boxes[:, 2:4] * (img_w, img_h)
+            mins = yolo_boxes[:, 0:2] * (img_w, img_h) - sizes / 2
+            bboxes = np.round(np.hstack([mins, sizes]), 2)
+            boxes = list(zip(class_ids.tolist(), bboxes.tolist()))
+        results.append((img_w, img_h, boxes))
+    return results
+
+
+class CocoExporter:
+    def __init__(self, dataset_folder, classes_path="classes.txt", workers=None):
+        self.image_folder = os.path.join(dataset_folder, 'images')
+        self.label_folder = os.path.join(dataset_folder, 'labels')
+        self.classes = load_classes(classes_path)
+        self.workers = workers or os.cpu_count() or 1
+
+    def _iter_tasks(self):
+        with os.scandir(self.image_folder) as it:
+            names = sorted(e.name for e in it if e.is_file() and e.name.lower().endswith(IMAGE_EXTENSIONS))
+        for i in range(0, len(names), TASK_SIZE):
+            chunk = names[i:i + TASK_SIZE]
+            yield chunk, [(os.path.join(self.image_folder, name),
+                           os.path.join(self.label_folder, os.path.splitext(name)[0] + '.txt')) for name in chunk]
+
+    def _iter_results(self, executor):
+        # 진행 중인 태스크 수를 제한해서 결과가 메모리에 쌓이지 않도록 함
+        window = deque()
+        for names, tasks in self._iter_tasks():
+            window.append((names, executor.submit(_parse_chunk, tasks)))
+            if len(window) >= self.workers * 2:
+                names, future = window.popleft()
+                yield from zip(names, future.result())
+        while window:
+            names, future = window.popleft()
+            yield from zip(names, future.result())
+
+    def export(self, output_path, progress_callback=None):
+        image_count = 0
+        annotation_count = 0
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+
+        # annotations 는 임시 파일에 먼저 써두고 images 뒤에 이어 붙임
+        with open(output_path, 'w', encoding='utf-8') as out, \
+                tempfile.TemporaryFile('w+', encoding='utf-8', dir=output_dir) as spool, \
+                ProcessPoolExecutor(max_workers=self.workers) as executor:
+            out.write('{"images": [')
+            for name, result in self._iter_results(executor):
+                if result is None:
+                    continue
+                img_w, img_h, boxes = result
+                image_count += 1
+                image_id = image_count
+                if progress_callback and image_count % TASK_SIZE == 0:
+                    progress_callback(image_count, 0)
+                if image_count > 1:
+                    out.write(',')
+                out.write('\n' + json.dumps({'id': image_id, 'file_name': name, 'width': img_w, 'height': img_h}))
+
+                for class_id, bbox in boxes:
+                    annotation_count += 1
+                    if annotation_count > 1:
+                        spool.write(',')
+                    spool.write('\n' + json.dumps({
+                        'id': annotation_count, 'image_id': image_id, 'category_id': class_id,
+                        'bbox': bbox, 'area': round(bbox[2] * bbox[3], 2), 'iscrowd': 0}))
+
+            out.write('\n], "annotations": [')
+            spool.seek(0)
+            shutil.copyfileobj(spool, out)
+            out.write('\n], "categories": [')
+            out.write(','.join('\n' + json.dumps({'id': i, 'name': name}) for i, name in enumerate(self.classes)))
+            out.write('\n]}\n')
+
+        return {'images': image_count, 'annotations': annotation_count}
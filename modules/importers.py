@@ -0,0 +1,333 @@
+import json
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from label_codec import format_line
+
+
+CHUNK_SIZE = 1 << 20  # 스트리밍 파싱 시 한 번에 읽는 크기 (1MB)
+FLUSH_LINES = 100000  # 라벨 라인을 이만큼 모으면 워커로 넘겨서 기록
+TASK_SIZE = 256  # 워커 하나에 넘기는 항목 수
+
+
+def load_classes(classes_path):
+    if not os.path.exists(classes_path):
+        return []
+    with open(classes_path, "r") as f:
+        return [line.strip() for line in f.readlines() if line.strip()]
+
+
+def save_classes(classes_path, classes):
+    with open(classes_path, "w") as f:
+        for label in classes:
+            f.write(f"{label}\n")
+
+
+def yolo_line(class_id, x_min, y_min, box_w, box_h, img_w, img_h):
+    x_center = (x_min + box_w / 2) / img_w
+    y_center = (y_min + box_h / 2) / img_h
+    return format_line(class_id, x_center, y_center, box_w / img_w, box_h / img_h)
+
+
+def _chunks(items, size=TASK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class _JsonStream:
+    """파일 전체를 메모리에 올리지 않고 JSON 값을 앞에서부터 하나씩 디코딩"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        # 이미 처리한 앞부분은 버려서 버퍼 크기를 일정하게 유지
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of JSON stream")
+        self.pos += 1
+
+    def skip(self, char):
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 버퍼 끝에서 잘린 숫자일 수 있으므로 더 읽고 다시 디코딩
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_sections(path):
+    """최상위 객체의 (key, value) 를 순서대로 반환, 배열 값은 원소 단위로 (key, element) 반환"""
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f)
+        stream.expect('{')
+        while not stream.skip('}'):
+            key = stream.decode()
+            stream.expect(':')
+            if stream.skip('['):
+                while not stream.skip(']'):
+                    yield key, stream.decode()
+                    stream.skip(',')
+            else:
+                yield key, stream.decode()
+            stream.skip(',')
+
+
+def _prepare_images(tasks):
+    # 이미지 복사 및 빈 라벨 파일 생성 (라벨은 이후 append 로 채움), 실패한 이미지는 건너뛰고 이름 반환
+    failed = []
+    for src, dst, label_path in tasks:
+        try:
+            shutil.copyfile(src, dst)
+        except OSError:
+            failed.append(label_path)
+            continue
+        open(label_path, 'w').close()
+    return failed
+
+
+def _append_labels(tasks):
+    for label_path, lines in tasks:
+        with open(label_path, 'a') as f:
+            f.write("".join(line + "\n" for line in lines))
+    return len(tasks)
+
+
+def _convert_voc_files(tasks):
+    written = 0
+    skipped = {}
+    for xml_path, images_dir, save_image_folder, save_label_folder, class_map in tasks:
+        try:
+            filename, size, objects = parse_voc_xml(xml_path)
+        except (ET.ParseError, ValueError):
+            name = os.path.basename(xml_path)
+            skipped[name] = skipped.get(name, 0) + 1
+            continue
+        if filename is None:
+            filename = os.path.splitext(os.path.basename(xml_path))[0] + '.jpg'
+        src = os.path.join(images_dir, filename)
+        img_w, img_h = size
+        # 원본 이미지가 없거나 <size> 가 0 이면 좌표를 정규화할 수 없으므로 파일 단위로 건너뜀
+        if not os.path.exists(src) or img_w <= 0 or img_h <= 0:
+            skipped[filename] = skipped.get(filename, 0) + 1
+            continue
+
+        lines = []
+        for name, (x_min, y_min, x_max, y_max) in objects:
+            if name not in class_map:
+                skipped[name] = skipped.get(name, 0) + 1
+                continue
+            lines.append(yolo_line(class_map[name], x_min, y_min, x_max - x_min, y_max - y_min, img_w, img_h))
+
+        base_name = os.path.splitext(os.path.basename(filename))[0]
+        shutil.copyfile(src, os.path.join(save_image_folder, os.path.basename(filename)))
+        with open(os.path.join(save_label_folder, base_name + '.txt'), 'w') as f:
+            f.write("".join(line + "\n" for line in lines))
+        written += 1
+    return written, skipped
+
+
+def _collect_voc_names(xml_paths):
+    names = set()
+    for xml_path in xml_paths:
+        try:
+            for _, elem in ET.iterparse(xml_path):
+                if elem.tag == 'object':
+                    names.add(elem.findtext('name', '').strip())
+                    elem.clear()
+        except ET.ParseError:
+            continue  # 변환 단계에서 skipped 로 집계
+    return names
+
+
+def parse_voc_xml(xml_path):
+    filename = None
+    size = (0, 0)
+    objects = []
+    # iterparse 로 object 단위 처리 후 바로 해제
+    for _, elem in ET.iterparse(xml_path):
+        if elem.tag == 'filename':
+            filename = (elem.text or '').strip() or None
+        elif elem.tag == 'size':
+            size = (float(elem.findtext('width', '0')), float(elem.findtext('height', '0')))
+        elif elem.tag == 'object':
+            box = elem.find('bndbox')
+            if box is not None:
+                coords = tuple(float(box.findtext(k, '0')) for k in ('xmin', 'ymin', 'xmax', 'ymax'))
+                objects.append((elem.findtext('name', '').strip(), coords))
+            elem.clear()
+    return filename, size, objects
+
+
+class DatasetImporter:
+    def __init__(self, save_folder, classes_path="classes.txt", add_missing=True, workers=None):
+        self.save_folder = save_folder
+        self.save_image_folder = os.path.join(save_folder, 'images')
+        self.save_label_folder = os.path.join(save_folder, 'labels')
+        self.classes_path = classes_path
+        self.classes = load_classes(classes_path)
+        self.add_missing = add_missing
+        self.workers = workers
+
+    def _class_map(self, names):
+        # 카테고리 이름을 classes.txt 인덱스에 매핑, 없는 이름은 옵션에 따라 추가
+        missing = [name for name in dict.fromkeys(names) if name not in self.classes]
+        if missing and self.add_missing:
+            # class_registry 가 이 모듈을 불러오므로 여기서 불러옴
+            from class_registry import ClassRegistry
+            # 클래스 변경이 라벨 파일에 반영되는 중이면 add 가 거부하므로 classes.txt 가 어긋나지 않음
+            registry = ClassRegistry(self.classes_path)
+            for name in missing:
+                if name not in registry.names:
+                    registry.add(name)
+            self.classes = list(registry.names)
+        return {name: i for i, name in enumerate(self.classes)}
+
+    def import_coco(self, json_path, images_dir, progress_callback=None):
+        os.makedirs(self.save_image_folder, exist_ok=True)
+        os.makedirs(self.save_label_folder, exist_ok=True)
+
+        # 1차 스트리밍: images / categories 메타데이터만 수집 (annotations 는 버림)
+        images = {}
+        categories = {}
+        for key, value in iter_json_sections(json_path):
+            if key == 'images':
+                images[value['id']] = (value['file_name'], value['width'], value['height'])
+            elif key == 'categories':
+                categories[value['id']] = value['name']
+
+        class_map = self._class_map(categories[k] for k in sorted(categories))
+        category_ids = {cat_id: class_map.get(name) for cat_id, name in categories.items()}
+
+        label_paths = {}
+        prepare_tasks = []
+        for image_id, (file_name, _, _) in images.items():
+            base_name = os.path.basename(file_name)
+            label_path = os.path.join(self.save_label_folder, os.path.splitext(base_name)[0] + '.txt')
+            label_paths[image_id] = label_path
+            prepare_tasks.append((os.path.join(images_dir, file_name),
+                                  os.path.join(self.save_image_folder, base_name), label_path))
+
+        skipped = {}
+        annotation_count = 0
+        chunks = list(_chunks(prepare_tasks))
+        total = len(chunks) + 1  # 마지막 1 단계는 annotations 변환
+        del prepare_tasks
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            failed = set()
+            for done, chunk_failed in enumerate(executor.map(_prepare_images, chunks), start=1):
+                failed.update(chunk_failed)
+                if progress_callback:
+                    progress_callback(done, total)
+            del chunks
+
+            # 복사하지 못한 이미지는 라벨도 만들지 않음
+            for image_id, label_path in list(label_paths.items()):
+                if label_path in failed:
+                    file_name = images[image_id][0]
+                    skipped[file_name] = skipped.get(file_name, 0) + 1
+                    del label_paths[image_id]
+
+            # 2차 스트리밍: annotations 를 라벨 라인으로 변환, 일정량마다 워커에서 기록
+            pending = {}
+            pending_lines = 0
+            for key, ann in iter_json_sections(json_path):
+                if key != 'annotations':
+                    continue
+                class_id = category_ids.get(ann['category_id'])
+                image = images.get(ann['image_id'])
+                if class_id is None or ann['image_id'] not in label_paths or not ann.get('bbox') or \
+                        not image[1] or not image[2]:
+                    reason = categories.get(ann['category_id'], 'invalid annotation') if class_id is None \
+                        else 'invalid annotation'
+                    skipped[reason] = skipped.get(reason, 0) + 1
+                    continue
+                x_min, y_min, box_w, box_h = ann['bbox']
+                line = yolo_line(class_id, x_min, y_min, box_w, box_h, image[1], image[2])
+                pending.setdefault(label_paths[ann['image_id']], []).append(line)
+                pending_lines += 1
+                annotation_count += 1
+                if pending_lines >= FLUSH_LINES:
+                    self._flush(executor, pending)
+                    pending = {}
+                    pending_lines = 0
+                    if progress_callback:
+                        progress_callback(total - 1, total)
+            self._flush(executor, pending)
+            if progress_callback:
+                progress_callback(total, total)
+
+        return {'images': len(images) - len(failed), 'annotations': annotation_count, 'skipped': skipped}
+
+    def _flush(self, executor, pending):
+        # 한 번의 flush 안에서 같은 라벨 파일은 하나의 태스크에만 들어가므로 동시 기록 충돌 없음
+        if pending:
+            list(executor.map(_append_labels, _chunks(list(pending.items()))))
+
+    def import_voc(self, annotations_dir, images_dir, progress_callback=None):
+        os.makedirs(self.save_image_folder, exist_ok=True)
+        os.makedirs(self.save_label_folder, exist_ok=True)
+
+        with os.scandir(annotations_dir) as it:
+            xml_paths = sorted(e.path for e in it if e.is_file() and e.name.lower().endswith('.xml'))
+
+        written = 0
+        skipped = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            names = set()
+            if self.add_missing:
+                for chunk_names in executor.map(_collect_voc_names, _chunks(xml_paths)):
+                    names.update(chunk_names)
+            class_map = self._class_map(sorted(names))
+
+            tasks = [(path, images_dir, self.save_image_folder, self.save_label_folder, class_map)
+                     for path in xml_paths]
+            chunks = list(_chunks(tasks))
+            for done, (chunk_written, chunk_skipped) in enumerate(executor.map(_convert_voc_files, chunks),
+                                                                  start=1):
+                written += chunk_written
+                for name, count in chunk_skipped.items():
+                    skipped[name] = skipped.get(name, 0) + count
+                if progress_callback:
+                    progress_callback(done, len(chunks))
+
+        return {'images': written, 'skipped': skipped}
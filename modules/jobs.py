@@ -0,0 +1,180 @@
+from collections import deque
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar, QPushButton
+
+
+MAX_SUMMARY_LENGTH = 80
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job(QObject):
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    started = pyqtSignal()
+
+    def __init__(self, title, fn, *args, **kwargs):
+        super(Job, self).__init__()
+        self.title = title
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.summary = None  # 결과를 짧은 문자열로 바꾸는 함수 (없으면 숫자/문자열/dict 결과만 표시)
+        self._cancel_requested = False
+
+    def cancel(self):
+        self._cancel_requested = True
+
+    def is_cancelled(self):
+        return self._cancel_requested
+
+    def describe(self, result):
+        if self.summary is not None:
+            return f"Done: {self.summary(result)}"
+        # 목록이나 배열은 그대로 문자열로 만들면 너무 길어짐
+        if isinstance(result, (int, float, str, dict)):
+            text = f"Done: {result}"
+            return text if len(text) <= MAX_SUMMARY_LENGTH else text[:MAX_SUMMARY_LENGTH - 3] + "..."
+        return "Done"
+
+    def report(self, done, total, rate=None):
+        """작업 함수의 progress_callback 으로 전달됨, 취소 요청 시 JobCancelled 발생"""
+        if self._cancel_requested:
+            raise JobCancelled()
+        message = f"{done}/{total}" if total else str(done)
+        if rate:
+            message += f" ({rate:.1f}/s)"
+        self.progress.emit(done, total, message)
+
+    def run(self):
+        if self._cancel_requested:
+            self.cancelled.emit()
+            return
+        self.started.emit()
+        try:
+            result = self.fn(*self.args, progress_callback=self.report, **self.kwargs)
+        except JobCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(result)
+
+
+class JobThread(QThread):
+    def __init__(self, job, parent=None):
+        super(JobThread, self).__init__(parent)
+        self.job = job
+
+    def run(self):
+        self.job.run()
+
+
+class JobManager(QObject):
+    job_added = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super(JobManager, self).__init__(parent)
+        self.queue = deque()
+        self.current_thread = None
+
+    def submit(self, job):
+        # 작업은 큐에 쌓이고 GUI 스레드 밖에서 하나씩 순서대로 실행
+        self.queue.append(job)
+        self.job_added.emit(job)
+        self._start_next()
+        return job
+
+    def _start_next(self):
+        if self.current_thread is not None or not self.queue:
+            return
+        job = self.queue.popleft()
+        self.current_thread = JobThread(job, self)
+        self.current_thread.finished.connect(self._thread_finished)
+        self.current_thread.start()
+
+    def _thread_finished(self):
+        self.current_thread.deleteLater()
+        self.current_thread = None
+        self._start_next()
+
+    def cancel_all(self):
+        for job in self.queue:
+            job.cancel()
+        if self.current_thread is not None:
+            self.current_thread.job.cancel()
+
+    def wait(self):
+        if self.current_thread is not None:
+            self.current_thread.wait()
+
+
+class JobRow(QWidget):
+    def __init__(self, job, parent=None):
+        super(JobRow, self).__init__(parent)
+        self.job = job
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header_layout = QHBoxLayout()
+        self.title_label = QLabel(job.title, self)
+        self.status_label = QLabel("Queued", self)
+        header_layout.addWidget(self.title_label)
+        header_layout.addStretch()
+        header_layout.addWidget(self.status_label)
+        layout.addLayout(header_layout)
+
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar(self)
+        self.cancel_button = QPushButton("Cancel", self)
+        self.cancel_button.clicked.connect(self.cancel)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+
+        job.started.connect(self.on_started)
+        job.progress.connect(self.on_progress)
+        job.finished.connect(lambda result: self.on_done(job.describe(result)))
+        job.failed.connect(lambda message: self.on_done(f"Failed: {message}"))
+        job.cancelled.connect(lambda: self.on_done("Cancelled"))
+
+    def cancel(self):
+        self.job.cancel()
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText("Cancelling...")
+
+    def on_started(self):
+        # 전체 개수를 알기 전에는 바쁨 표시
+        self.progress_bar.setRange(0, 0)
+        self.status_label.setText("Running")
+
+    def on_progress(self, done, total, message):
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+        self.status_label.setText(message)
+
+    def on_done(self, message):
+        if self.progress_bar.maximum() == 0:
+            self.progress_bar.setRange(0, 1)
+            self.progress_bar.setValue(1)
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(message)
+
+
+class JobsPanel(QWidget):
+    def __init__(self, manager, parent=None):
+        super(JobsPanel, self).__init__(parent)
+        self.manager = manager
+        self.layout = QVBoxLayout(self)
+        self.layout.addStretch()
+        manager.job_added.connect(self.add_job)
+
+    def add_job(self, job):
+        self.layout.insertWidget(self.layout.count() - 1, JobRow(job, self))
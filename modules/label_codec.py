@@ -0,0 +1,133 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+PRECISION = 6
+LINE_FORMAT = f'%d %.{PRECISION}f %.{PRECISION}f %.{PRECISION}f %.{PRECISION}f'
+BATCH_SIZE = 256  # 워커 하나에 넘기는 파일 수
+
+
+def parse(data, strict=False):
+    """YOLO 라벨 텍스트(bytes 또는 str)를 class id (N,) int 배열과 박스 (N, 4) float 배열로 변환
+
+    형식이 잘못된 줄은 건너뛰고, strict 이면 해당 줄 번호와 함께 ValueError 발생
+    """
+    # 숫자가 아닌 글자는 어차피 변환에 실패하므로 바이트를 그대로 글자로 옮김 (디코딩 오류 없음)
+    text = data.decode('latin-1') if isinstance(data, bytes) else data
+    values = None
+    if not text.strip():
+        values = np.empty((0, 5), dtype=np.float64)
+    else:
+        try:
+            # numpy C 파서가 토큰 분리, 실수 변환, 줄마다 필드 수 확인을 한 번에 처리 (빈 줄은 건너뜀)
+            values = np.loadtxt(text.splitlines(), dtype=np.float64, ndmin=2, comments=None, encoding=None)
+            if values.shape[1] != 5:
+                values = None
+        except ValueError:
+            pass
+    if values is None:
+        # 형식이 잘못된 줄이 있는 파일만 줄 단위로 읽고 해당 줄만 건너뜀
+        if isinstance(data, bytes):
+            text = data.decode('utf-8', 'replace')
+        valid = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            row = line.split()
+            if not row:
+                continue
+            try:
+                if len(row) != 5:
+                    raise ValueError
+                valid.append([float(value) for value in row])
+            except ValueError:
+                if strict:
+                    raise ValueError(f"Malformed label line {line_number}: {line.strip()}")
+        values = np.array(valid, dtype=np.float64).reshape(-1, 5)
+    # 예전 증강 결과의 "0.0" 같은 class id 도 정수로 읽음
+    return np.rint(values[:, 0]).astype(np.int64), values[:, 1:5]
+
+
+def format_labels(class_ids, boxes):
+    """class id 와 박스 배열을 고정 소수점 자리수의 YOLO 라벨 텍스트(bytes)로 변환, 줄마다 개행"""
+    if len(boxes) == 0:
+        return b''
+    values = np.column_stack([np.rint(np.asarray(class_ids, dtype=np.float64)), boxes])
+    return (((LINE_FORMAT + '\n') * len(values)) % tuple(values.ravel().tolist())).encode('ascii')
+
+
+def format_line(class_id, x_center, y_center, width, height):
+    return LINE_FORMAT % (class_id, x_center, y_center, width, height)
+
+
+def read(label_path, strict=False):
+    with open(label_path, 'rb') as f:
+        return parse(f.read(), strict)
+
+
+def write(label_path, class_ids, boxes):
+    with open(label_path, 'wb') as f:
+        f.write(format_labels(class_ids, boxes))
+
+
+def _read_chunk(paths):
+    return [read(path) for path in paths]
+
+
+def _run_batches(worker, items, workers, progress_callback):
+    chunks = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+    if len(chunks) <= 1:
+        # 파일이 적으면 프로세스 풀 생성 비용이 더 큼
+        results = [worker(chunk) for chunk in chunks]
+        if progress_callback and chunks:
+            progress_callback(1, 1)
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker, chunk) for chunk in chunks]
+        try:
+            for done, future in enumerate(futures, start=1):
+                results.append(future.result())
+                if progress_callback:
+                    progress_callback(done, len(chunks))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return results
+
+
+def read_many(label_paths, workers=None, progress_callback=None):
+    """여러 라벨 파일을 병렬로 읽어서 입력 순서대로 (class id, 박스) 목록 반환"""
+    return [result for chunk in _run_batches(_read_chunk, list(label_paths), workers, progress_callback)
+            for result in chunk]
+
+
+def label_path_for(image_path, label_folder):
+    return os.path.join(label_folder, os.path.splitext(os.path.basename(image_path))[0] + '.txt')
+
+
+if __name__ == '__main__':
+    # 형식 확인: python label_codec.py
+    ids, boxes = parse(b'0 0.5 0.5 0.1 0.2\n\n3 0.25 0.75 0.5 0.125\n')
+    assert ids.tolist() == [0, 3] and boxes.shape == (2, 4)
+    assert parse(format_labels(ids, boxes))[0].tolist() == ids.tolist()
+    assert np.array_equal(parse(format_labels(ids, boxes))[1], boxes)
+    assert format_labels(ids, boxes).count(b'\n') == 2
+    assert parse(b'')[1].shape == (0, 4) and parse(b' \r\n\n')[1].shape == (0, 4)
+    assert parse('0.0 .5 .5 .1 .2\r\n')[0].tolist() == [0]
+
+    # 필드 수가 다른 줄은 열을 밀지 않고 해당 줄만 건너뜀
+    confidence = b'0 0.5 0.5 0.1 0.1 0.9\n' * 5
+    assert len(parse(confidence)[0]) == 0
+    ids, boxes = parse(b'0 .5 .5 .1\n1 .5 .5 .1 .2 .9\n2 .5 .5 .1 .2\n')
+    assert ids.tolist() == [2] and boxes.tolist() == [[.5, .5, .1, .2]]
+    for data in (confidence, b'0 .5 .5 .1 .2\nx .5 .5 .1 .2\n'):
+        try:
+            parse(data, strict=True)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("strict parse accepted malformed input")
+    print("label_codec: OK")
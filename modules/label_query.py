@@ -0,0 +1,100 @@
+import datetime
+import operator
+import os
+import re
+
+import numpy as np
+
+from dataset_index import DatasetIndex
+from label_store import LabelStore
+
+
+OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+             '=': operator.eq, '==': operator.eq, '!=': operator.ne}
+CLAUSE_PATTERNS = [
+    ('no_labels', re.compile(r'^no\s+labels?$')),
+    ('class', re.compile(r'^class\s*(=|==|!=)\s*(\S+)$')),
+    ('area', re.compile(r'^area\s*(<=|>=|<|>|=|==)\s*([\d.]+)\s*(%?)$')),
+    ('boxes', re.compile(r'^boxes\s*(<=|>=|<|>|=|==|!=)\s*(\d+)$')),
+    ('created', re.compile(r'^created\s+(after|before)\s+(\d{4}-\d{2}-\d{2})$')),
+]
+
+
+def parse_query(text):
+    """'class = ink and boxes > 20' 형식을 (종류, 인자...) 목록으로 변환"""
+    clauses = []
+    for part in re.split(r'\s+and\s+', text.strip().lower()):
+        part = part.strip()
+        if not part:
+            continue
+        for kind, pattern in CLAUSE_PATTERNS:
+            match = pattern.match(part)
+            if match:
+                clauses.append((kind,) + match.groups())
+                break
+        else:
+            raise ValueError(f"Unknown query: {part}")
+    return clauses
+
+
+class LabelQueryIndex:
+    """이미지별 라벨 정보로 조건에 맞는 이미지 인덱스를 벡터 연산으로 찾음"""
+
+    def __init__(self, dataset_folder, image_files, class_names=()):
+        self.image_files = image_files
+        self.class_names = [name.lower() for name in class_names]
+        names, self.boxes = LabelStore(dataset_folder).load()
+
+        # 이미지 목록 순서 -> 라벨 파일 번호 (-1 은 라벨 파일 없음)
+        label_ids = {name: i for i, name in enumerate(names)}
+        self.label_ids = np.array([label_ids.get(os.path.splitext(name)[0] + '.txt', -1) for name in image_files],
+                                  dtype=np.int64)
+        self.num_labels = len(names)
+        self.counts = np.bincount(self.boxes['image'], minlength=self.num_labels)
+
+        dataset_index = DatasetIndex.for_folder(dataset_folder)
+        self.mtimes = np.array([(dataset_index.stamp('images', name) or (0, 0))[0] for name in image_files],
+                               dtype=np.int64)
+
+    def _per_image(self, label_values, missing):
+        # 라벨 파일 단위 값을 이미지 목록 순서로 변환
+        has_label = self.label_ids >= 0
+        result = np.full(len(self.image_files), missing, dtype=label_values.dtype)
+        result[has_label] = label_values[self.label_ids[has_label]]
+        return result
+
+    def _any_box(self, box_mask):
+        hit = np.zeros(self.num_labels, dtype=bool)
+        hit[self.boxes['image'][box_mask]] = True
+        return self._per_image(hit, False)
+
+    def _class_id(self, value):
+        if value.isdigit():
+            return int(value)
+        if value in self.class_names:
+            return self.class_names.index(value)
+        raise ValueError(f"Unknown class: {value}")
+
+    def search(self, text):
+        """조건을 모두 만족하는 이미지 인덱스 (오름차순) 반환"""
+        mask = np.ones(len(self.image_files), dtype=bool)
+        for clause in parse_query(text):
+            kind = clause[0]
+            if kind == 'no_labels':
+                mask &= self._per_image(self.counts, 0) == 0
+            elif kind == 'class':
+                _, op, value = clause
+                matched = self._any_box(self.boxes['class'] == self._class_id(value))
+                mask &= matched if op != '!=' else ~matched
+            elif kind == 'area':
+                _, op, value, percent = clause
+                threshold = float(value) / 100 if percent else float(value)
+                mask &= self._any_box(OPERATORS[op](self.boxes['w'] * self.boxes['h'], threshold))
+            elif kind == 'boxes':
+                _, op, value = clause
+                mask &= OPERATORS[op](self._per_image(self.counts, 0), int(value))
+            elif kind == 'created':
+                _, direction, date = clause
+                timestamp = datetime.datetime.strptime(date, '%Y-%m-%d').timestamp() * 1e9
+                mask &= self.mtimes > timestamp if direction == 'after' else self.mtimes < timestamp
+        return np.flatnonzero(mask)
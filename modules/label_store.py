@@ -0,0 +1,176 @@
+import json
+import os
+
+import numpy as np
+
+import label_codec
+from dataset_index import IMAGE_EXTENSIONS
+
+
+CACHE_FOLDER = '.label_cache'
+BOX_DTYPE = np.dtype([('image', np.int32), ('class', np.int32),
+                      ('cx', np.float32), ('cy', np.float32), ('w', np.float32), ('h', np.float32)])
+
+
+class LabelStore:
+    """모든 라벨 파일을 하나의 구조화 배열로 모아서 디스크에 캐시 (파일별 mtime/크기로 무효화)"""
+
+    def __init__(self, dataset_folder, workers=None):
+        self.dataset_folder = dataset_folder
+        self.image_folder = os.path.join(dataset_folder, 'images')
+        self.label_folder = os.path.join(dataset_folder, 'labels')
+        self.cache_folder = os.path.join(dataset_folder, CACHE_FOLDER)
+        self.boxes_path = os.path.join(self.cache_folder, 'boxes.npy')
+        self.meta_path = os.path.join(self.cache_folder, 'files.json')
+        self.workers = workers
+
+    def _load_cache(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                meta = json.load(f)
+            boxes = np.load(self.boxes_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return {}, np.zeros(0, dtype=BOX_DTYPE)
+        if boxes.dtype != BOX_DTYPE:
+            return {}, np.zeros(0, dtype=BOX_DTYPE)
+        return meta.get('files', {}), boxes
+
+    def _save_cache(self, files, boxes):
+        os.makedirs(self.cache_folder, exist_ok=True)
+        tmp_path = self.boxes_path + '.tmp.npy'
+        np.save(tmp_path, boxes)
+        os.replace(tmp_path, self.boxes_path)
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'files': files}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _scan_labels(self):
+        # 공유 인덱스는 감시 이벤트가 늦게 반영될 수 있으므로 캐시 무효화 기준은 디스크에서 직접 읽음
+        stamps = {}
+        if os.path.isdir(self.label_folder):
+            with os.scandir(self.label_folder) as it:
+                for e in it:
+                    if e.name.lower().endswith('.txt') and e.is_file():
+                        st = e.stat()
+                        stamps[e.name] = [st.st_mtime_ns, st.st_size]
+        return stamps
+
+    def image_names(self):
+        if not os.path.isdir(self.image_folder):
+            return []
+        with os.scandir(self.image_folder) as it:
+            return sorted(e.name for e in it if e.name.lower().endswith(IMAGE_EXTENSIONS) and e.is_file())
+
+    def load_stats(self, progress_callback=None):
+        """통계용 (라벨 파일 이름 목록, 박스 구조화 배열, 이미지 이름 목록)"""
+        names, boxes = self.load(progress_callback)
+        return names, boxes, self.image_names()
+
+    def load(self, progress_callback=None):
+        """(라벨 파일 이름 목록, 박스 구조화 배열) 반환, image 필드는 이름 목록의 인덱스"""
+        stamps = self._scan_labels()
+        names = sorted(stamps)
+        cached_files, cached_boxes = self._load_cache()
+
+        # 바뀐 파일만 다시 파싱
+        parsed = {}
+        tasks = []
+        for name in names:
+            mtime, size = stamps[name]
+            cached = cached_files.get(name)
+            if cached is None or cached[0] != mtime or cached[1] != size:
+                tasks.append((name, os.path.join(self.label_folder, name)))
+
+        if tasks:
+            results = label_codec.read_many([path for _, path in tasks], self.workers, progress_callback)
+            parsed = {name: result for (name, _), result in zip(tasks, results)}
+        elif len(names) == len(cached_files):
+            return names, cached_boxes
+
+        # 새 배열 구성: 바뀌지 않은 파일은 캐시 구간을 그대로 복사
+        counts = []
+        for name in names:
+            if name in parsed:
+                counts.append(len(parsed[name][0]))
+            else:
+                start, end = cached_files[name][2:4]
+                counts.append(end - start)
+        boxes = np.empty(sum(counts), dtype=BOX_DTYPE)
+        files = {}
+        offset = 0
+        for image_id, (name, count) in enumerate(zip(names, counts)):
+            part = boxes[offset:offset + count]
+            if name in parsed:
+                class_ids, values = parsed[name]
+                part['class'] = class_ids
+                part['cx'] = values[:, 0]
+                part['cy'] = values[:, 1]
+                part['w'] = values[:, 2]
+                part['h'] = values[:, 3]
+            else:
+                start, end = cached_files[name][2:4]
+                part[:] = cached_boxes[start:end]
+            part['image'] = image_id
+            files[name] = stamps[name] + [offset, offset + count]
+            offset += count
+
+        del cached_boxes  # 메모리 매핑을 닫아야 캐시 파일을 교체할 수 있음 (Windows)
+        self._save_cache(files, boxes)
+        return names, boxes
+
+
+def class_counts(boxes, num_classes):
+    class_ids = boxes['class']
+    return np.bincount(class_ids[class_ids >= 0], minlength=num_classes)
+
+
+def boxes_per_image(boxes, num_images):
+    return np.bincount(boxes['image'], minlength=num_images)
+
+
+def area_histogram(boxes, bins=(0, 0.0001, 0.001, 0.01, 0.1, 1.0)):
+    """이미지 대비 박스 면적 비율 분포"""
+    return np.histogram(boxes['w'] * boxes['h'], bins=bins)
+
+
+def boxes_per_image_name(names, boxes, image_names):
+    """이미지별 박스 수 (라벨 파일이 없는 이미지는 0)"""
+    per_file = boxes_per_image(boxes, len(names))
+    file_index = {os.path.splitext(name)[0]: i for i, name in enumerate(names)}
+    indexes = np.array([file_index.get(os.path.splitext(name)[0], -1) for name in image_names], dtype=np.int64)
+    per_image = np.zeros(len(image_names), dtype=np.int64)
+    labeled = indexes >= 0
+    per_image[labeled] = per_file[indexes[labeled]]
+    return per_image, int((~labeled).sum())
+
+
+def summarize(names, boxes, labels, image_names=None):
+    """통계 요약 문자열, image_names 가 있으면 이미지 기준 (라벨 파일이 없는 이미지 포함)"""
+    lines = [f"Label files: {len(names)}", f"Boxes: {len(boxes)}", ""]
+    if image_names is not None:
+        lines.insert(0, f"Images: {len(image_names)}")
+    counts = class_counts(boxes, len(labels))
+    for class_id, count in enumerate(counts):
+        name = labels[class_id] if class_id < len(labels) else f"#{class_id}"
+        lines.append(f"{name}: {count}")
+
+    if image_names is not None:
+        per_image, unlabeled = boxes_per_image_name(names, boxes, image_names)
+        if len(per_image):
+            lines += ["", f"Boxes per image: min {per_image.min()}, mean {per_image.mean():.1f}, "
+                          f"max {per_image.max()}",
+                      f"Images without boxes: {int((per_image == 0).sum())} ({unlabeled} without a label file)"]
+    else:
+        per_file = boxes_per_image(boxes, len(names))
+        if len(per_file):
+            lines += ["", f"Boxes per label file: min {per_file.min()}, mean {per_file.mean():.1f}, "
+                          f"max {per_file.max()}",
+                      f"Empty label files: {int((per_file == 0).sum())}"]
+
+    hist, edges = area_histogram(boxes)
+    lines.append("")
+    lines.append("Box area (fraction of image):")
+    for count, low, high in zip(hist, edges[:-1], edges[1:]):
+        lines.append(f"  {low:g} - {high:g}: {count}")
+    return "\n".join(lines)
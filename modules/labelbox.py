@@ -1,6 +1,10 @@
-from PyQt5.QtWidgets import QVBoxLayout, QDialog, QListWidget, QPushButton, QLineEdit, QHBoxLayout, QMessageBox
+from PyQt5.QtWidgets import QVBoxLayout, QDialog, QListWidget, QPushButton, QLineEdit, QHBoxLayout, QMessageBox, \
+    QInputDialog, QFileDialog
 import os
 
+from class_registry import ClassRegistry
+from jobs import Job
+
 class LabelDialog(QDialog):
     def __init__(self, labels, parent=None):
         super(LabelDialog, self).__init__(parent)
@@ -8,7 +12,8 @@ class LabelDialog(QDialog):
 
         self.labels = labels
         self.selected_label = None
-        self.delete_mode = False  # 삭제 모드 플래그
+        self.mode = None  # None (선택), "delete", "rename", "merge"
+        self.registry = ClassRegistry("classes.txt")
 
         self.layout = QVBoxLayout(self)
 
@@ -25,20 +30,35 @@ class LabelDialog(QDialog):
         self.label_input.setPlaceholderText("Enter new label")
         self.add_label_button = QPushButton("Add Label", self)
         self.delete_label_button = QPushButton("Delete Label", self)
+        self.rename_label_button = QPushButton("Rename Label", self)
+        self.merge_label_button = QPushButton("Merge Label", self)
 
         label_input_layout.addWidget(self.label_input)
         label_input_layout.addWidget(self.add_label_button)
         label_input_layout.addWidget(self.delete_label_button)
+        label_input_layout.addWidget(self.rename_label_button)
+        label_input_layout.addWidget(self.merge_label_button)
 
         self.layout.addLayout(label_input_layout)
 
         # 버튼 클릭 이벤트 연결
+        self.mode_buttons = {
+            "delete": (self.delete_label_button, "Delete Label", "Click on a label to delete it."),
+            "rename": (self.rename_label_button, "Rename Label", "Click on a label to rename it."),
+            "merge": (self.merge_label_button, "Merge Label", "Click on a label to merge it into another."),
+        }
         self.add_label_button.clicked.connect(self.add_label)
-        self.delete_label_button.clicked.connect(self.toggle_delete_mode)
+        self.delete_label_button.clicked.connect(lambda: self.toggle_mode("delete"))
+        self.rename_label_button.clicked.connect(lambda: self.toggle_mode("rename"))
+        self.merge_label_button.clicked.connect(lambda: self.toggle_mode("merge"))
 
     def item_clicked(self, item):
-        if self.delete_mode:
+        if self.mode == "delete":
             self.delete_label(item)
+        elif self.mode == "rename":
+            self.rename_label(item)
+        elif self.mode == "merge":
+            self.merge_label(item)
         else:
             self.selected_label = item.text()
             self.accept()  # OK 버튼 없이 다이얼로그 닫기
@@ -49,35 +69,122 @@ class LabelDialog(QDialog):
     def add_label(self):
         new_label = self.label_input.text().strip()
         if new_label and new_label not in self.labels:
-            self.labels.append(new_label)
-            self.list_widget.addItem(new_label)
-            self.label_input.clear()
-            self.update_classes_file()
+            if self.update_classes_file(new_label):
+                self.labels.append(new_label)
+                self.list_widget.addItem(new_label)
+                self.label_input.clear()
         elif new_label in self.labels:
             QMessageBox.warning(self, "Duplicate Label", "This label already exists.")
         else:
             QMessageBox.warning(self, "Invalid Label", "Label cannot be empty.")
 
-    def toggle_delete_mode(self):
-        if self.delete_mode:
-            self.delete_mode = False
-            self.delete_label_button.setText("Delete Label")
-        else:
-            self.delete_mode = True
-            self.delete_label_button.setText("Cancel")
-            QMessageBox.information(self, "Delete Mode", "Click on a label to delete it.")
+    def toggle_mode(self, mode):
+        # 다른 모드가 켜져 있으면 먼저 끔
+        for name, (button, text, _) in self.mode_buttons.items():
+            button.setText(text)
+        if self.mode == mode:
+            self.mode = None
+            return
+        self.mode = mode
+        button, _, message = self.mode_buttons[mode]
+        button.setText("Cancel")
+        QMessageBox.information(self, "Manage Labels", message)
+
+    def select_dataset_folder(self):
+        """id 가 바뀌는 변경을 반영할 데이터셋 폴더 선택"""
+        start_folder = getattr(self.parent().window(), "output_folder", None) if self.parent() else None
+        return QFileDialog.getExistingDirectory(self, "Select Dataset Folder to Update Labels", start_folder or "")
+
+    def confirm_dataset_folders(self, title):
+        """라벨 파일을 변환할 폴더 목록을 보여주고 확인받음, 취소 시 None"""
+        folders = self.registry.dataset_folders()
+        while True:
+            if folders:
+                message = "Label files in these dataset folders will be updated:\n\n" + "\n".join(folders)
+            else:
+                message = "No dataset folders are recorded for classes.txt yet."
+            message += ("\n\nLabel files in any other folder that uses classes.txt will keep the old class ids "
+                        "and must be added here to stay correct.")
+            box = QMessageBox(QMessageBox.Question, title, message, parent=self)
+            update_button = box.addButton("Update", QMessageBox.AcceptRole)
+            add_button = box.addButton("Add Folder...", QMessageBox.ActionRole)
+            box.addButton(QMessageBox.Cancel)
+            update_button.setEnabled(bool(folders))
+            box.exec_()
+            if box.clickedButton() is add_button:
+                folder = self.select_dataset_folder()
+                if folder and os.path.abspath(folder) not in folders:
+                    folders.append(os.path.abspath(folder))
+            elif box.clickedButton() is update_button:
+                return folders
+            else:
+                return None
+
+    def apply_registry_change(self, title, change, args, renames):
+        # id 가 바뀌는 변경은 이 classes.txt 를 쓰는 모든 데이터셋의 라벨 파일도 함께 변환해야 기존 라벨이 틀어지지 않음
+        window = self.parent().window() if self.parent() else None
+        job_manager = getattr(window, "job_manager", None)
+        if job_manager is None:
+            QMessageBox.warning(self, "Manage Labels", "Label files can only be updated from the main window.")
+            return False
+        dataset_folders = self.confirm_dataset_folders(title)
+        if not dataset_folders:
+            return False
+        for folder in dataset_folders:
+            self.registry.register_dataset(folder)
+
+        # 라벨 파일 변환은 백그라운드 작업으로 실행하고 끝난 뒤에 목록과 캔버스를 갱신
+        job = Job(title, change, *args, dataset_folders)
+        job.finished.connect(lambda result: self.on_registry_changed(renames))
+        job_manager.submit(job)
+        return True
+
+    def on_registry_changed(self, renames):
+        self.reload_labels()
+        canvas = self.parent()
+        if hasattr(canvas, "rename_labels"):
+            canvas.rename_labels(renames)
+
+    def reload_labels(self):
+        # 캔버스와 같은 목록 객체를 공유하므로 내용만 교체
+        self.labels[:] = self.registry.names
+        self.list_widget.clear()
+        self.list_widget.addItems(self.labels)
 
     def delete_label(self, item):
         label = item.text()
-        self.labels.remove(label)
-        self.list_widget.takeItem(self.list_widget.row(item))
-        self.update_classes_file()
-        self.toggle_delete_mode()  # 삭제 후 삭제 모드 비활성화
+        answer = QMessageBox.question(self, "Delete Label",
+                                      f"Delete '{label}' and remove its boxes from the dataset's label files?")
+        if answer == QMessageBox.Yes:
+            self.apply_registry_change(f"Delete class {label}", self.registry.delete, (label,), {label: None})
+        self.toggle_mode("delete")  # 삭제 후 삭제 모드 비활성화
+
+    def rename_label(self, item):
+        label = item.text()
+        new_label, ok = QInputDialog.getText(self, "Rename Label", "New name:", QLineEdit.Normal, label)
+        new_label = new_label.strip()
+        if ok and new_label and new_label != label:
+            try:
+                # 이름만 바뀌고 id 는 그대로라서 라벨 파일은 건드리지 않음
+                self.registry.rename(label, new_label)
+                self.on_registry_changed({label: new_label})
+            except (ValueError, RuntimeError) as e:
+                QMessageBox.warning(self, "Rename Label", str(e))
+        self.toggle_mode("rename")
+
+    def merge_label(self, item):
+        label = item.text()
+        targets = [name for name in self.labels if name != label]
+        target, ok = QInputDialog.getItem(self, "Merge Label", f"Merge '{label}' into:", targets, 0, False)
+        if ok and target:
+            self.apply_registry_change(f"Merge class {label} into {target}", self.registry.merge, (label, target),
+                                       {label: target})
+        self.toggle_mode("merge")
 
-    def update_classes_file(self):
+    def update_classes_file(self, new_label):
         try:
-            with open("classes.txt", "w") as f:
-                for label in self.labels:
-                    f.write(f"{label}\n")
+            self.registry.add(new_label)
+            return True
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to update classes.txt: {e}")
+            return False
@@ -0,0 +1,40 @@
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QImage, QPainter, QColor
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+
+
+class PreviewSurface(QWidget):
+    """카메라 프레임만 그리는 고정 크기 표시 영역 (라벨링 상태와 레이아웃을 건드리지 않음)"""
+
+    def __init__(self, parent=None):
+        super(PreviewSurface, self).__init__(parent)
+        self.image = None
+        self.frame = None
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)  # 매 프레임 배경 지우기 생략
+
+    def set_frame(self, frame_rgb):
+        # QImage 가 numpy 버퍼를 직접 참조하므로 배열도 함께 보관
+        self.frame = frame_rgb
+        h, w = frame_rgb.shape[:2]
+        self.image = QImage(frame_rgb.data, w, h, frame_rgb.strides[0], QImage.Format_RGB888)
+        self.update()
+
+    def clear(self):
+        self.frame = None
+        self.image = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0))
+        if self.image is None:
+            return
+
+        # 종횡비를 유지하면서 가운데에 맞춰 그림 (별도의 스케일링 픽스맵 생성 없음)
+        scale = min(self.width() / self.image.width(), self.height() / self.image.height())
+        w = self.image.width() * scale
+        h = self.image.height() * scale
+        target = QRectF((self.width() - w) / 2, (self.height() - h) / 2, w, h)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawImage(target, self.image)
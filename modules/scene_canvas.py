@@ -0,0 +1,310 @@
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap, QStaticText, QTransform
+from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsItem, QGraphicsPixmapItem
+
+from class_picker import ClassPicker
+
+try:
+    from PyQt5.QtWidgets import QOpenGLWidget
+except ImportError:
+    QOpenGLWidget = None
+
+
+HANDLE_MIN_BOX_PIXELS = 24  # 화면상 박스가 이보다 작으면 꼭지점 핸들 생략
+TEXT_MIN_LOD = 0.5  # 이보다 축소되면 라벨 텍스트 생략
+HANDLE_FULL_SCALE = 0.5  # 이 배율까지는 핸들을 원래 화면 크기로 그림 (더 축소하면 고정 여유 안에 맞춰 작게)
+
+
+class BoxItem(QGraphicsItem):
+    """라벨 사각형 하나를 나타내는 장면 아이템, 확대 수준에 따라 핸들/텍스트를 생략"""
+
+    static_texts = {}  # 라벨별 QStaticText 캐시
+
+    def __init__(self, rect, label, vertex_radius=5):
+        super(BoxItem, self).__init__()
+        self.rect = rect.normalized()
+        self.label = label
+        self.vertex_radius = vertex_radius
+        self.hovered = False
+        self.hovered_vertex = None
+        # 영역 여유를 장면 좌표로 고정해서 확대/축소 때 모든 아이템의 BSP 인덱스를 다시 만들지 않게 함
+        self.margin = (vertex_radius * 2 + 2) / HANDLE_FULL_SCALE
+
+    def set_rect(self, rect):
+        self.prepareGeometryChange()
+        self.rect = rect.normalized()
+
+    def set_hover(self, hovered, vertex=None):
+        if self.hovered != hovered or self.hovered_vertex != vertex:
+            self.hovered = hovered
+            self.hovered_vertex = vertex
+            self.update()
+
+    def vertices(self):
+        return [self.rect.topLeft(), self.rect.topRight(), self.rect.bottomRight(), self.rect.bottomLeft()]
+
+    def boundingRect(self):
+        return self.rect.adjusted(-self.margin, -self.margin, self.margin, self.margin)
+
+    def paint(self, painter, option, widget=None):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+
+        pen = QPen(QColor(0, 255, 0), 2)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.setBrush(QColor(255, 0, 0, 25) if self.hovered else Qt.NoBrush)
+        painter.drawRect(self.rect)
+
+        screen_w = self.rect.width() * lod
+        screen_h = self.rect.height() * lod
+        if min(screen_w, screen_h) >= HANDLE_MIN_BOX_PIXELS:
+            painter.setBrush(QColor(255, 255, 255))
+            for i, vertex in enumerate(self.vertices()):
+                radius = (self.vertex_radius * 2 if self.hovered_vertex == i else self.vertex_radius) / lod
+                # 많이 축소하면 테두리(화면 2px)까지 포함해서 고정 여유 안에 들어가도록 줄임
+                radius = min(radius, self.margin - 1 / lod)
+                painter.drawEllipse(vertex, radius, radius)
+
+        if lod >= TEXT_MIN_LOD:
+            text = self.static_texts.get(self.label)
+            if text is None:
+                text = QStaticText(self.label)
+                text.prepare(QTransform(), painter.font())
+                self.static_texts[self.label] = text
+            size = text.size()
+            if size.width() <= screen_w and size.height() <= screen_h:
+                # 텍스트는 화면 크기 그대로 박스 중앙에 그림
+                center = painter.worldTransform().map(self.rect.center())
+                painter.save()
+                painter.resetTransform()
+                painter.setPen(QPen(QColor(255, 255, 255)))
+                painter.drawStaticText(QPointF(center.x() - size.width() / 2, center.y() - size.height() / 2), text)
+                painter.restore()
+
+
+class SceneCanvas(QGraphicsView):
+    """Canvas 와 같은 인터페이스의 QGraphicsView 기반 렌더러 (선택적으로 OpenGL 뷰포트 사용)"""
+
+    def __init__(self, labels, parent=None, use_opengl=True):
+        super(SceneCanvas, self).__init__(parent)
+        self.labels = labels
+        self.class_picker = ClassPicker(labels, self)  # 박스마다 다이얼로그를 새로 만들지 않고 재사용
+        self.pixmap = None
+        self.image_size = None
+        self.labeling_done = False
+        self.vertex_radius = 5
+        self.current_item = None
+        self.drawing_origin = None
+        self.drag_item = None
+        self.drag_offset = None
+        self.resize_item = None
+        self.resize_anchor = None
+        self.hovered_item = None
+        self.selected_item = None
+        self.panning = False
+        self.last_mouse_position = None
+        self._scale_factor = 1.0
+
+        self.graphics_scene = QGraphicsScene(self)
+        self.graphics_scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+        self.setScene(self.graphics_scene)
+        self.pixmap_item = QGraphicsPixmapItem()
+        self.pixmap_item.setTransformationMode(Qt.SmoothTransformation)
+        self.pixmap_item.setZValue(-1)
+        self.graphics_scene.addItem(self.pixmap_item)
+
+        if use_opengl and QOpenGLWidget is not None:
+            self.setViewport(QOpenGLWidget())
+        self.setRenderHint(QPainter.Antialiasing)
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.setOptimizationFlag(QGraphicsView.DontSavePainterState)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setMouseTracking(True)
+        self.setFocusPolicy(Qt.StrongFocus)
+
+    @property
+    def scale_factor(self):
+        return self._scale_factor
+
+    @scale_factor.setter
+    def scale_factor(self, value):
+        self._scale_factor = value
+        self.apply_scale()
+
+    @property
+    def shapes(self):
+        return [([item.rect.topLeft(), item.rect.bottomRight()], item.label) for item in self.box_items()]
+
+    @shapes.setter
+    def shapes(self, shapes):
+        self.clear_shapes()
+        for shape, label in shapes:
+            self.add_shape(shape, label)
+
+    def box_items(self):
+        return [item for item in self.graphics_scene.items(Qt.AscendingOrder) if isinstance(item, BoxItem)]
+
+    def add_shape(self, shape, label):
+        item = BoxItem(QRectF(shape[0], shape[1]), label, self.vertex_radius)
+        self.graphics_scene.addItem(item)
+        return item
+
+    def apply_scale(self):
+        self.setTransform(QTransform.fromScale(self._scale_factor, self._scale_factor))
+
+    def clear_shapes(self):
+        for item in self.box_items():
+            self.graphics_scene.removeItem(item)
+        self.hovered_item = None
+        self.selected_item = None
+
+    def get_shapes(self):
+        return self.shapes
+
+    def rename_labels(self, renames):
+        """클래스 이름 변경/병합/삭제를 화면의 박스에 반영 (새 이름이 None 이면 박스 삭제)"""
+        for item in self.box_items():
+            if item.label not in renames:
+                continue
+            if renames[item.label] is None:
+                for attr in ('hovered_item', 'selected_item', 'drag_item', 'resize_item'):
+                    if getattr(self, attr) is item:
+                        setattr(self, attr, None)
+                self.graphics_scene.removeItem(item)
+            else:
+                item.label = renames[item.label]
+                item.update()
+
+    def load_pixmap(self, pixmap):
+        self.pixmap = pixmap
+        self.image_size = pixmap.size()
+        self.clear_shapes()
+        self.pixmap_item.setPixmap(pixmap)
+        self.graphics_scene.setSceneRect(QRectF(pixmap.rect()))
+
+    def load_image(self, image):
+        self.load_pixmap(QPixmap.fromImage(image))
+
+    def update_image_offset(self):
+        # 장면 정렬은 QGraphicsView 가 처리
+        pass
+
+    def _item_at(self, scene_pos):
+        # BSP 인덱스로 커서 주변 아이템만 조회 (위에 그려진 아이템 우선)
+        tolerance = self.vertex_radius * 2 / self._scale_factor
+        area = QRectF(scene_pos.x() - tolerance, scene_pos.y() - tolerance, tolerance * 2, tolerance * 2)
+        candidates = [item for item in self.graphics_scene.items(area) if isinstance(item, BoxItem)]
+        for item in candidates:
+            for i, vertex in enumerate(item.vertices()):
+                if (scene_pos - vertex).manhattanLength() < tolerance:
+                    return item, i
+        for item in candidates:
+            if item.rect.contains(scene_pos):
+                return item, None
+        return None, None
+
+    def mousePressEvent(self, event):
+        try:
+            self.setFocus()
+            scene_pos = self.mapToScene(event.pos())
+            if event.button() == Qt.LeftButton and self.pixmap:
+                item, vertex = self._item_at(scene_pos)
+                self.selected_item = item
+                if item is not None and vertex is not None:
+                    # 반대쪽 꼭지점을 고정하고 크기 조절
+                    self.resize_item = item
+                    self.resize_anchor = item.vertices()[(vertex + 2) % 4]
+                elif item is not None:
+                    self.drag_item = item
+                    self.drag_offset = scene_pos - item.rect.topLeft()
+                elif self.graphics_scene.sceneRect().contains(scene_pos):
+                    self.drawing_origin = scene_pos
+                    self.current_item = self.add_shape([scene_pos, scene_pos], "")
+            elif event.button() == Qt.MiddleButton:
+                self.panning = True
+                self.last_mouse_position = event.pos()
+        except Exception as e:
+            print(f"Error in mousePressEvent: {e}")
+
+    def mouseMoveEvent(self, event):
+        try:
+            scene_pos = self.mapToScene(event.pos())
+            if self.current_item is not None:
+                self.current_item.set_rect(QRectF(self.drawing_origin, scene_pos))
+            elif self.resize_item is not None:
+                self.resize_item.set_rect(QRectF(self.resize_anchor, scene_pos))
+            elif self.drag_item is not None:
+                top_left = scene_pos - self.drag_offset
+                self.drag_item.set_rect(QRectF(top_left, self.drag_item.rect.size()))
+            elif self.panning and self.last_mouse_position is not None:
+                delta = event.pos() - self.last_mouse_position
+                self.last_mouse_position = event.pos()
+                self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
+                self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+            else:
+                item, vertex = self._item_at(scene_pos)
+                if item is not self.hovered_item and self.hovered_item is not None:
+                    self.hovered_item.set_hover(False)
+                if item is not None:
+                    item.set_hover(True, vertex)
+                self.hovered_item = item
+        except Exception as e:
+            print(f"Error in mouseMoveEvent: {e}")
+
+    def mouseReleaseEvent(self, event):
+        try:
+            if event.button() == Qt.LeftButton:
+                if self.current_item is not None:
+                    item = self.current_item
+                    self.current_item = None
+                    label_name = self.class_picker.pick()
+                    if label_name:
+                        item.label = label_name
+                        item.update()
+                        self.labeling_done = True
+                    else:
+                        self.graphics_scene.removeItem(item)
+                        # 팝업을 닫아도 이미 그린 박스가 있으면 라벨링 상태 유지
+                        self.labeling_done = bool(self.box_items())
+                    if not self.labeling_done:  # 라벨이 선택되지 않으면 비디오 피드로 복귀
+                        self.window().reset_to_video_feed()
+                self.resize_item = None
+                self.drag_item = None
+            elif event.button() == Qt.MiddleButton:
+                self.panning = False
+                self.last_mouse_position = None
+        except Exception as e:
+            print(f"Error in mouseReleaseEvent: {e}")
+
+    def mouseDoubleClickEvent(self, event):
+        try:
+            if self.selected_item is not None:
+                label_name = self.class_picker.pick(self.selected_item.label)
+                if label_name:
+                    self.selected_item.label = label_name
+                    self.selected_item.update()
+        except Exception as e:
+            print(f"Error in mouseDoubleClickEvent: {e}")
+
+    def keyPressEvent(self, event):
+        try:
+            if event.key() == Qt.Key_Delete and self.selected_item is not None:
+                if self.hovered_item is self.selected_item:
+                    self.hovered_item = None
+                self.graphics_scene.removeItem(self.selected_item)
+                self.selected_item = None
+            elif event.key() == Qt.Key_Return and self.pixmap:
+                self.window().capture_still()
+        except Exception as e:
+            print(f"Error in keyPressEvent: {e}")
+
+    def wheelEvent(self, event):
+        try:
+            if event.modifiers() == Qt.ControlModifier:
+                delta = event.angleDelta().y() / 120
+                self._scale_factor = max(0.1, min(self._scale_factor + delta * 0.1, 5.0))
+                self.apply_scale()
+            else:
+                super(SceneCanvas, self).wheelEvent(event)
+        except Exception as e:
+            print(f"Error in wheelEvent: {e}")
@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+
+class ShapeGrid:
+    """사각형 범위를 균일 격자에 등록해서 점 주변의 후보 사각형만 찾는 공간 인덱스"""
+
+    def __init__(self, cell_size=64, margin=0):
+        self.cell_size = cell_size
+        self.margin = margin  # 꼭지점 판정 거리만큼 범위를 넓혀서 등록
+        self.cells = defaultdict(set)
+        self.shape_cells = {}
+
+    def clear(self):
+        self.cells.clear()
+        self.shape_cells.clear()
+
+    def _cells_for(self, shape):
+        x_min = min(shape[0].x(), shape[1].x()) - self.margin
+        x_max = max(shape[0].x(), shape[1].x()) + self.margin
+        y_min = min(shape[0].y(), shape[1].y()) - self.margin
+        y_max = max(shape[0].y(), shape[1].y()) + self.margin
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(int(x_min // size), int(x_max // size) + 1)
+                for cy in range(int(y_min // size), int(y_max // size) + 1)]
+
+    def insert(self, key, shape):
+        cells = self._cells_for(shape)
+        for cell in cells:
+            self.cells[cell].add(key)
+        self.shape_cells[key] = cells
+
+    def remove(self, key):
+        for cell in self.shape_cells.pop(key, ()):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+
+    def update(self, key, shape):
+        self.remove(key)
+        self.insert(key, shape)
+
+    def query(self, pos):
+        size = self.cell_size
+        return self.cells.get((int(pos.x() // size), int(pos.y() // size)), set())
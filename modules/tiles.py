@@ -0,0 +1,115 @@
+import math
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QObject, QRect, QRectF, QPointF, QSize, QRunnable, QThreadPool, pyqtSignal
+
+
+TILE_SIZE = 256
+TILED_MIN_PIXELS = 8 * 1000 * 1000  # 이보다 큰 이미지는 타일로 나눠서 그림
+BASE_MAX_SIZE = 1024  # 타일이 준비되기 전에 대신 그릴 축소본의 최대 크기
+MAX_CACHED_TILES = 512  # 256x256 RGB32 기준 약 128MB
+
+
+class TileSignals(QObject):
+    tile_ready = pyqtSignal(object, object)
+
+
+class TileJob(QRunnable):
+    def __init__(self, source, key, source_rect, size, signals):
+        super(TileJob, self).__init__()
+        self.source = source
+        self.key = key
+        self.source_rect = source_rect
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        # QImage 는 GUI 스레드 밖에서도 안전하게 다룰 수 있음
+        tile = self.source.copy(self.source_rect)
+        if tile.size() != self.size:
+            tile = tile.scaled(self.size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        self.signals.tile_ready.emit(self.key, tile)
+
+
+class TilePyramid(QObject):
+    """큰 이미지를 배율별 타일로 나누고 보이는 타일만 백그라운드에서 생성해서 그림"""
+
+    updated = pyqtSignal()
+
+    def __init__(self, image, parent=None):
+        super(TilePyramid, self).__init__(parent)
+        self.source = image
+        self.width = image.width()
+        self.height = image.height()
+        self.max_level = max(0, int(math.ceil(math.log2(max(self.width, self.height) / TILE_SIZE))))
+        self.cache = OrderedDict()
+        self.pending = set()
+        self.current_level = None
+        self.pool = QThreadPool(self)
+        self.signals = TileSignals()
+        self.signals.tile_ready.connect(self.on_tile_ready)
+
+        base_scale = min(1.0, BASE_MAX_SIZE / max(self.width, self.height))
+        self.base = image.scaled(int(self.width * base_scale) or 1, int(self.height * base_scale) or 1,
+                                 Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        self.base_scale = (self.base.width() / self.width, self.base.height() / self.height)
+
+    def level_for(self, scale_factor):
+        # 화면 배율 이상의 해상도를 가진 가장 작은 레벨 선택
+        if scale_factor >= 1:
+            return 0
+        return min(self.max_level, int(math.floor(math.log2(1 / scale_factor))))
+
+    def on_tile_ready(self, key, tile):
+        self.pending.discard(key)
+        self.cache[key] = tile
+        while len(self.cache) > MAX_CACHED_TILES:
+            self.cache.popitem(last=False)
+        self.updated.emit()
+
+    def request(self, key, source_rect, size):
+        if key in self.pending:
+            return
+        self.pending.add(key)
+        self.pool.start(TileJob(self.source, key, source_rect, size, self.signals))
+
+    def cancel_pending(self):
+        # 아직 시작하지 않은 타일 작업은 버림 (배율 변경 시 이전 레벨 요청 정리)
+        self.pool.clear()
+        self.pending.clear()
+
+    def draw(self, painter, offset, scale_factor, exposed_rect):
+        level = self.level_for(scale_factor)
+        if level != self.current_level:
+            self.cancel_pending()
+            self.current_level = level
+        step = TILE_SIZE << level  # 타일 하나가 덮는 원본 픽셀 수
+
+        # 화면에 보이는 영역을 원본 이미지 좌표로 변환
+        x0 = max(0, (exposed_rect.left() - offset.x()) / scale_factor)
+        y0 = max(0, (exposed_rect.top() - offset.y()) / scale_factor)
+        x1 = min(self.width, (exposed_rect.right() + 1 - offset.x()) / scale_factor)
+        y1 = min(self.height, (exposed_rect.bottom() + 1 - offset.y()) / scale_factor)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        for ty in range(int(y0 // step), int(math.ceil(y1 / step))):
+            for tx in range(int(x0 // step), int(math.ceil(x1 / step))):
+                source_rect = QRect(tx * step, ty * step,
+                                    min(step, self.width - tx * step), min(step, self.height - ty * step))
+                target = QRectF(offset + QPointF(source_rect.x() * scale_factor, source_rect.y() * scale_factor),
+                                offset + QPointF((source_rect.right() + 1) * scale_factor,
+                                                 (source_rect.bottom() + 1) * scale_factor))
+                key = (level, tx, ty)
+                tile = self.cache.get(key)
+                if tile is not None:
+                    self.cache.move_to_end(key)
+                    painter.drawImage(target, tile)
+                    continue
+
+                # 타일이 준비될 때까지 축소본의 해당 부분을 늘려서 그림
+                base_rect = QRectF(source_rect.x() * self.base_scale[0], source_rect.y() * self.base_scale[1],
+                                   source_rect.width() * self.base_scale[0], source_rect.height() * self.base_scale[1])
+                painter.drawImage(target, self.base, base_rect)
+                size = QSize(max(1, -(-source_rect.width() >> level)), max(1, -(-source_rect.height() >> level)))
+                self.request(key, source_rect, size)
@@ -0,0 +1,140 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from importers import load_classes, TASK_SIZE
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+CACHE_NAME = '.validation_cache.json'
+
+
+def validate_label_file(label_path, num_classes):
+    """라벨 파일 하나를 검사해서 (line_no, message) 목록 반환"""
+    issues = []
+    # 줄 단위로 디코딩해서 깨진 줄만 문제로 보고 (파일 전체 검사를 중단하지 않음)
+    with open(label_path, 'rb') as f:
+        for line_no, raw_line in enumerate(f, start=1):
+            try:
+                line = raw_line.decode('utf-8')
+            except UnicodeDecodeError:
+                issues.append((line_no, "not valid UTF-8 text"))
+                continue
+            parts = line.split()
+            if not parts:
+                continue
+            if len(parts) != 5:
+                issues.append((line_no, f"expected 5 fields, got {len(parts)}"))
+                continue
+            try:
+                class_value = float(parts[0])
+                x_center, y_center, width, height = map(float, parts[1:])
+            except ValueError:
+                issues.append((line_no, "non-numeric value"))
+                continue
+
+            if not parts[0].isdigit():
+                issues.append((line_no, f"class id '{parts[0]}' is not an integer"))
+            if class_value < 0 or class_value >= num_classes:
+                issues.append((line_no, f"class id {parts[0]} out of range (classes: {num_classes})"))
+            if width <= 0 or height <= 0:
+                issues.append((line_no, "zero-area box"))
+            if not (0 <= x_center <= 1 and 0 <= y_center <= 1 and width <= 1 and height <= 1):
+                issues.append((line_no, "coordinates out of range [0, 1]"))
+            elif (x_center - width / 2 < 0 or x_center + width / 2 > 1 or
+                  y_center - height / 2 < 0 or y_center + height / 2 > 1):
+                issues.append((line_no, "box extends outside the image"))
+    return issues
+
+
+def _validate_chunk(tasks):
+    return [(name, validate_label_file(path, num_classes)) for name, path, num_classes in tasks]
+
+
+class DatasetValidator:
+    def __init__(self, dataset_folder, classes_path="classes.txt", workers=None):
+        self.dataset_folder = dataset_folder
+        self.image_folder = os.path.join(dataset_folder, 'images')
+        self.label_folder = os.path.join(dataset_folder, 'labels')
+        self.cache_path = os.path.join(dataset_folder, CACHE_NAME)
+        self.num_classes = len(load_classes(classes_path))
+        self.workers = workers
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 클래스 수가 바뀌면 모든 결과가 무효
+        if cache.get('num_classes') != self.num_classes:
+            return {}
+        return cache.get('files', {})
+
+    def _save_cache(self, files):
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'num_classes': self.num_classes, 'files': files}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _scan(self, folder, extensions):
+        entries = {}
+        if os.path.isdir(folder):
+            with os.scandir(folder) as it:
+                for e in it:
+                    if e.is_file() and e.name.lower().endswith(extensions):
+                        st = e.stat()
+                        entries[e.name] = (e.path, st.st_size, st.st_mtime_ns)
+        return entries
+
+    def validate(self, progress_callback=None):
+        """데이터셋 전체 검사, (file, line_no, message) 목록과 다시 검사한 파일 수 반환"""
+        images = self._scan(self.image_folder, IMAGE_EXTENSIONS)
+        labels = self._scan(self.label_folder, ('.txt',))
+        image_stems = {os.path.splitext(name)[0] for name in images}
+        label_stems = {os.path.splitext(name)[0] for name in labels}
+
+        issues = []
+        for name in sorted(images):
+            if os.path.splitext(name)[0] not in label_stems:
+                issues.append((os.path.join('images', name), 0, "image has no label file"))
+        for name in sorted(labels):
+            if os.path.splitext(name)[0] not in image_stems:
+                issues.append((os.path.join('labels', name), 0, "label has no image file"))
+
+        # 크기와 mtime 이 같은 파일은 캐시된 결과 재사용
+        cache = self._load_cache()
+        files = {}
+        tasks = []
+        for name, (path, size, mtime) in labels.items():
+            cached = cache.get(name)
+            if cached and cached['size'] == size and cached['mtime'] == mtime:
+                files[name] = cached
+            else:
+                files[name] = {'size': size, 'mtime': mtime, 'issues': []}
+                tasks.append((name, path, self.num_classes))
+
+        if tasks:
+            chunks = [tasks[i:i + TASK_SIZE] for i in range(0, len(tasks), TASK_SIZE)]
+            done = 0
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(_validate_chunk, chunk) for chunk in chunks]
+                try:
+                    for future in futures:
+                        for name, file_issues in future.result():
+                            files[name]['issues'] = file_issues
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, len(chunks))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            self._save_cache(files)
+        elif len(files) != len(cache):
+            self._save_cache(files)
+
+        for name in sorted(files):
+            for line_no, message in files[name]['issues']:
+                issues.append((os.path.join('labels', name), line_no, message))
+        return issues, len(tasks)